@@ -0,0 +1,150 @@
+#!/usr/bin/python3
+
+import argparse
+import multiprocessing
+import sys
+from multiprocessing.connection import wait
+import engine
+import metrics
+from engine import KIND_ORDER, parse_years, select_specs
+from wayback import init_fetch_mode
+
+
+# One entry point for rebuilding any range of years:
+#
+#   python3 archiver.py run --years 2013-2024 --kinds guests,attending,performers,blurbs --jobs 8
+#   python3 archiver.py list --years 2019-2024
+#   python3 archiver.py reprocess --years 2016 [--refetch]
+#
+# Each spec runs in its own process, up to --jobs at a time. A year's kinds
+# run in KIND_ORDER, so its blurb backfill starts only once the scrapes that
+# insert its rows are done, and different years run side by side. The
+# 1997-2007 backfill specs also write rows for earlier years, so each of
+# them waits for everything before it. When a spec fails, the specs that
+# depend on it are skipped and the rest carry on.
+#
+# Bio pages that fail to fetch or parse are quarantined (see quarantine.py)
+# instead of failing their spec; reprocess retries just those, one spec
+# after the other.
+
+KIND_NAMES = {
+    "guests": "scrape_archive",
+    "backfill": "backfill",
+    "attending": "scrape_archive_attending",
+    "performers": "scrape_archive_performers",
+    "blurbs": "scrape_archive_backfill_blurb",
+}
+
+# Kinds whose rows can belong to years other than their own.
+CROSS_YEAR_KINDS = ("backfill",)
+
+
+def parse_kinds(value):
+    kinds = set()
+    for name in value.split(","):
+        if name in KIND_NAMES:
+            kinds.add(KIND_NAMES[name])
+        elif name in KIND_ORDER:
+            kinds.add(name)
+        elif name:
+            raise argparse.ArgumentTypeError("unknown kind %r, use %s" % (name, ", ".join(KIND_NAMES)))
+    return kinds
+
+
+def spec_name(spec):
+    return "%s %s" % (spec["year"], spec["kind"])
+
+
+def schedule(specs):
+    # Spec index -> indexes of the specs it waits for.
+    depends = {}
+    last_of_year = {}
+    for index, spec in enumerate(specs):
+        if spec["kind"] in CROSS_YEAR_KINDS:
+            depends[index] = set(range(index))
+        else:
+            depends[index] = {last_of_year[spec["year"]]} if spec["year"] in last_of_year else set()
+        last_of_year[spec["year"]] = index
+    return depends
+
+
+def run_spec(spec, parse_jobs, options):
+    engine.PARSE_JOBS = parse_jobs
+    engine.run_with(spec, options)
+
+
+def run_all(specs, jobs, options):
+    depends = schedule(specs)
+    parse_jobs = max(1, engine.PARSE_JOBS // jobs)
+    context = multiprocessing.get_context("fork")
+    waiting = set(range(len(specs)))
+    running = {}
+    done = set()
+    failed = set()
+
+    while waiting or running:
+        for index in sorted(waiting):
+            if depends[index] & failed:
+                waiting.discard(index)
+                failed.add(index)
+                metrics.warning("%s: skipped, it depends on a failed spec" % spec_name(specs[index]))
+            elif len(running) < jobs and depends[index] <= done:
+                waiting.discard(index)
+                process = context.Process(target=run_spec, args=(specs[index], parse_jobs, options), name=spec_name(specs[index]))
+                process.start()
+                running[process.sentinel] = (index, process)
+        if not running:
+            continue
+
+        for sentinel in wait(list(running)):
+            index, process = running.pop(sentinel)
+            process.join()
+            if process.exitcode == 0:
+                done.add(index)
+            else:
+                failed.add(index)
+                metrics.warning("%s: failed with exit code %s" % (spec_name(specs[index]), process.exitcode))
+
+    metrics.info("%s specs done, %s failed or skipped" % (len(done), len(failed)))
+    return 1 if failed else 0
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Rebuild archived years.")
+    commands = parser.add_subparsers(dest="command", required=True)
+    for command in ("run", "list", "reprocess"):
+        command_parser = commands.add_parser(command)
+        command_parser.add_argument("--years", type=parse_years, help="e.g. 2013-2024,1999")
+        command_parser.add_argument("--kinds", type=parse_kinds, help="any of %s, or full script kinds" % ", ".join(KIND_NAMES))
+        if command != "list":
+            command_parser.add_argument("--record", metavar="BUNDLE", help="as for the year scripts")
+            command_parser.add_argument("--replay", metavar="BUNDLE", help="as for the year scripts")
+        if command == "run":
+            command_parser.add_argument("--jobs", type=int, default=1, help="specs to run at once")
+            engine.add_run_options(command_parser)
+        if command == "reprocess":
+            command_parser.add_argument("--refetch", action="store_true", help="download the pages again, bypassing the stored bytes and the snapshot cache")
+    args = parser.parse_args(argv)
+
+    specs = select_specs(args.years, args.kinds)
+    if args.command == "list":
+        for index, depends in schedule(specs).items():
+            if len(depends) > 1:
+                after = "  after all of the above"
+            elif depends:
+                after = "  after %s" % spec_name(specs[min(depends)])
+            else:
+                after = ""
+            metrics.info(spec_name(specs[index]) + after)
+        return 0
+
+    init_fetch_mode(sys.argv[1:] if argv is None else argv)
+    if args.command == "reprocess":
+        remaining = sum(engine.reprocess(spec, refetch=args.refetch) for spec in specs)
+        metrics.info("%s pages still quarantined" % remaining)
+        return 1 if remaining else 0
+    return run_all(specs, max(1, args.jobs), args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
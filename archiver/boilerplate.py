@@ -0,0 +1,152 @@
+#!/usr/bin/python3
+
+import argparse
+import json
+import os
+import sys
+from collections import Counter
+from fingerprints import digest
+import metrics
+from wayback import init_fetch_mode
+
+
+# Cross-page boilerplate removal. Every bio page of a year comes from the
+# same site template, so a text line that shows up on most of the year's
+# pages (menus, headings, sidebars, the copyright footer) is template, and
+# what is left once those lines are gone is the guest's own text. learn
+# counts each distinct line once per page over all of a spec's bio pages
+# and keeps those on more than share of them; strip() drops them from a
+# page in one pass over its lines. Learned templates are saved as
+# templates/<year>_<kind>.json (or ARCHIVER_TEMPLATE_DIR), which specs
+# built with specs.template_bio() cut their biographies with instead of
+# marker lines and offsets. That is opt-in; no spec does it yet.
+#
+#   python3 boilerplate.py learn --years 2013-2018 [--share 0.5]
+#   python3 boilerplate.py compare --years 2013-2018 [--show 3]
+#
+# compare sets template and marker biographies side by side for every page,
+# to see whether a year can move to template_bio() without changing rows.
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+TEMPLATE_DIR = os.environ.get("ARCHIVER_TEMPLATE_DIR", os.path.join(HERE, "templates"))
+
+SHARE = 0.5
+# Below this many pages every line looks like template.
+MIN_PAGES = 5
+
+
+class Template:
+
+    def __init__(self, lines=(), share=SHARE, pages=0):
+        self.lines = frozenset(lines)
+        self.share = share
+        self.pages = pages
+
+    @classmethod
+    def learn(cls, texts, share=SHARE):
+        counts = Counter()
+        pages = 0
+        for text in texts:
+            pages += 1
+            counts.update(set(line.strip() for line in text.split("\n")))
+        if pages < MIN_PAGES:
+            raise ValueError("%s pages are too few to tell template lines apart, %s needed" % (pages, MIN_PAGES))
+        return cls([line for line, count in counts.items() if line and count > share * pages], share, pages)
+
+    def strip(self, text):
+        return "\n".join(line for line in text.split("\n") if line.strip() not in self.lines)
+
+    def save(self, path):
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        with open(path + ".tmp", "w", encoding="utf-8") as f:
+            json.dump({"share": self.share, "pages": self.pages, "lines": sorted(self.lines)}, f, indent=1, ensure_ascii=False)
+            f.write("\n")
+        os.replace(path + ".tmp", path)
+
+
+def template_path(year, kind, directory=None):
+    return os.path.join(directory or TEMPLATE_DIR, "%s_%s.json" % (year, kind))
+
+
+def load_template(year, kind, directory=None):
+    path = template_path(year, kind, directory)
+    if not os.path.exists(path):
+        raise RuntimeError("%s: no boilerplate template, learn it with python3 boilerplate.py learn --years %s" % (path, year))
+    with open(path, "rb") as f:
+        raw = f.read()
+    saved = json.loads(raw)
+    template = Template(saved["lines"], saved["share"], saved["pages"])
+    # Part of the fingerprint of every record cut with it.
+    template.digest = digest(raw)
+    return template
+
+
+def learn(specs, share=None):
+    # engine imports this module, so it is imported here, once it is loaded.
+    import engine
+    for spec in specs:
+        spec_share = share or spec["bio"].get("template") or SHARE
+        texts = (engine.page_text(page) for entry, page in engine.bio_pages(spec))
+        try:
+            template = Template.learn(texts, spec_share)
+        except ValueError as error:
+            metrics.warning("%s %s: %s, skipped" % (spec["year"], spec["kind"], error))
+            continue
+        path = template_path(spec["year"], spec["kind"])
+        template.save(path)
+        metrics.info("%s %s: %s template lines from %s pages to %s" % (spec["year"], spec["kind"], len(template.lines), template.pages, path))
+
+
+def compare(specs, show=0):
+    import engine
+    for spec in specs:
+        if "template" in spec["bio"] or not os.path.exists(template_path(spec["year"], spec["kind"])):
+            continue
+        markers = engine.Extractor(spec)
+        template = engine.Extractor(dict(spec, bio=dict(spec["bio"], template=SHARE)))
+        pages = same = inside = failed = 0
+        for entry, page in engine.bio_pages(spec):
+            pages += 1
+            stripped, _ = template.biography(page, entry["name"])
+            try:
+                expected, _ = markers.biography(page, entry["name"])
+            except engine.ExtractionError:
+                failed += 1
+                continue
+            expected, stripped = " ".join((expected or "").split()), " ".join((stripped or "").split())
+            if expected == stripped:
+                same += 1
+                continue
+            inside += expected in stripped
+            if show:
+                show -= 1
+                metrics.info("  %s\n    markers:  %.300s\n    template: %.300s" % (entry["name"], expected, stripped))
+        metrics.info("%s %s: %s pages, %s the same, %s more around the marker biography, %s without markers" % (spec["year"], spec["kind"], pages, same, inside, failed))
+
+
+def main(argv=None):
+    from engine import parse_years, select_specs
+    parser = argparse.ArgumentParser(description="Learn and check per-year boilerplate templates of bio pages.")
+    commands = parser.add_subparsers(dest="command", required=True)
+    for command in ("learn", "compare"):
+        command_parser = commands.add_parser(command)
+        command_parser.add_argument("--years", type=parse_years, help="e.g. 2013-2018")
+        command_parser.add_argument("--kinds", type=lambda value: set(value.split(",")), help="e.g. scrape_archive")
+        command_parser.add_argument("--replay", metavar="BUNDLE", help="as for the year scripts")
+        if command == "learn":
+            command_parser.add_argument("--share", type=float, help="lines on more than this share of pages are template (default %s)" % SHARE)
+        else:
+            command_parser.add_argument("--show", type=int, default=0, help="print the first N pages that differ")
+    args = parser.parse_args(argv)
+
+    init_fetch_mode(sys.argv[1:] if argv is None else argv)
+    specs = [spec for spec in select_specs(args.years, args.kinds) if spec.get("bio") and spec.get("mode") != "update_blurb"]
+    if args.command == "learn":
+        learn(specs, args.share)
+    else:
+        compare(specs, args.show)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
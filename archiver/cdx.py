@@ -0,0 +1,220 @@
+#!/usr/bin/python3
+
+import json
+import os
+import re
+import sys
+from datetime import datetime
+from urllib.parse import urlencode, urlparse
+import metrics
+
+
+# Snapshot discovery from the Wayback CDX index. Instead of trusting the
+# timestamp baked into each script's people_url, the usable (not 4xx/5xx)
+# captures under a bio page's directory in its year are listed once (a
+# prefix query, capped at CDX_LIMIT rows), and every guest detail URL in
+# that directory is resolved to its closest capture in the same year. When
+# the listing came back whole, a URL missing from it has no usable capture
+# that year and is planned as None, so it is never requested; so is a URL
+# ARCHIVER_CDX_FILE only knows as 404/403. Anything else the index has no
+# capture of falls back to its hardcoded snapshot.
+
+CDX_ENDPOINT = "https://web.archive.org/cdx/search/cdx"
+CDX_FILE = os.environ.get("ARCHIVER_CDX_FILE")
+CDX_LIMIT = int(os.environ.get("ARCHIVER_CDX_LIMIT", "20000"))
+
+WAYBACK_RE = re.compile(r"^https?://web\.archive\.org/web/(\d{4,14})([a-z]{2}_)?/(.+)$")
+GOOD_STATUS = re.compile(r"^[23]\d\d$|^-$")
+
+_indexes = {}
+_file_indexes = {}
+
+
+def parse_wayback_url(url):
+    match = WAYBACK_RE.match(url)
+    if match is None:
+        return None
+    return match.group(1), match.group(2) or "", match.group(3)
+
+
+def normalize_url(original):
+    if "://" not in original:
+        original = "http://" + original
+    parsed = urlparse(original)
+    host = parsed.netloc.lower()
+    if host.endswith(":80") or host.endswith(":443"):
+        host = host.rsplit(":", 1)[0]
+    if host.startswith("www."):
+        host = host[4:]
+    path = parsed.path or "/"
+    key = host + path
+    if parsed.query:
+        key += "?" + parsed.query
+    return key.lower()
+
+
+def _seconds(timestamp):
+    padded = timestamp + "00000101000000"[len(timestamp):]
+    return datetime.strptime(padded[:14], "%Y%m%d%H%M%S").timestamp()
+
+
+class CdxIndex:
+
+    def __init__(self):
+        self.captures = {}
+        self.rows = 0
+        # True when this is every usable capture under the prefix that year.
+        self.complete = False
+
+    def add(self, timestamp, original, status):
+        self.rows += 1
+        self.captures.setdefault(normalize_url(original), []).append((timestamp, original, status))
+
+    def __len__(self):
+        return len(self.captures)
+
+    def captured_in(self, original, year):
+        return any(capture[0][:4] == year for capture in self.captures.get(normalize_url(original), ()))
+
+    def closest(self, original, timestamp):
+        # Only captures from the timestamp's own year count.
+        year = timestamp[:4]
+        captures = [capture for capture in self.captures.get(normalize_url(original), ()) if capture[0][:4] == year]
+        if not captures:
+            return None
+
+        target = _seconds(timestamp)
+        best = None
+        for capture in captures:
+            if not GOOD_STATUS.match(capture[2]):
+                continue
+            distance = abs(_seconds(capture[0]) - target)
+            if best is None or distance < best[0]:
+                best = (distance, capture)
+
+        if best is None:
+            return None
+        return best[1]
+
+
+def parse_listing(text):
+    index = CdxIndex()
+    text = text.strip()
+    if not text:
+        return index
+
+    if text.startswith("["):
+        rows = json.loads(text)
+        if not rows:
+            return index
+        fields = rows[0]
+        for row in rows[1:]:
+            record = dict(zip(fields, row))
+            index.add(record["timestamp"], record["original"], record.get("statuscode", "200"))
+        return index
+
+    for line in text.splitlines():
+        parts = line.split()
+        if len(parts) >= 5:
+            # Default CDX layout: urlkey timestamp original mimetype statuscode digest length
+            index.add(parts[1], parts[2], parts[4])
+        elif len(parts) == 3:
+            # fl=timestamp,original,statuscode
+            index.add(parts[0], parts[1], parts[2])
+    return index
+
+
+def load_listing_file(filename):
+    if filename not in _file_indexes:
+        with open(filename, "r", encoding="utf-8") as f:
+            _file_indexes[filename] = parse_listing(f.read())
+        metrics.info("loaded %s CDX urls from %s" % (len(_file_indexes[filename]), filename))
+    return _file_indexes[filename]
+
+
+def url_prefix(original):
+    # The directory a page is in, e.g. dragoncon.org/people/ for
+    # http://www.dragoncon.org/people/guest.html. Pages told apart by their
+    # query (?q=guest_details_page&id=7) would otherwise list the whole
+    # site, so those go down to their first query parameter, in the sorted
+    # order of the CDX urlkey: dragoncon.org/?id= here, dragoncon.org/?q=node/
+    # for ?q=node/7.
+    path, _, query = normalize_url(original).partition("?")
+    if not query:
+        return path[:path.rfind("/") + 1]
+    params = sorted(query.split("&"))
+    first = params[0]
+    cut = first.find("=")
+    if len(params) == 1:
+        cut = max(cut, first.rfind("/"))
+    return path + "?" + first[:cut + 1]
+
+
+def listing_url(prefix, year):
+    params = {
+        "url": prefix,
+        "matchType": "prefix",
+        "from": str(year),
+        "to": str(year),
+        "filter": "!statuscode:[45]..",
+        "limit": str(CDX_LIMIT),
+        "fl": "timestamp,original,statuscode",
+        "output": "json",
+    }
+    return CDX_ENDPOINT + "?" + urlencode(params)
+
+
+def get_index(prefix, year, fetch):
+    if CDX_FILE:
+        return load_listing_file(CDX_FILE)
+
+    key = (prefix, str(year))
+    if key not in _indexes:
+        try:
+            content = fetch(listing_url(prefix, year))
+        except Exception as e:
+            # Without a listing every URL falls back to its hardcoded snapshot.
+            metrics.warning("CDX listing for %s in %s unavailable: %s" % (prefix, year, e))
+            content = None
+        _indexes[key] = parse_listing(content.decode("utf-8") if content else "")
+        if _indexes[key].rows >= CDX_LIMIT:
+            metrics.warning("CDX listing for %s in %s stopped at %s captures, raise ARCHIVER_CDX_LIMIT" % (prefix, year, CDX_LIMIT))
+        else:
+            _indexes[key].complete = content is not None
+        metrics.info("loaded %s CDX urls for %s in %s" % (len(_indexes[key]), prefix, year))
+    return _indexes[key]
+
+
+def build_fetch_plan(urls, fetch):
+    plan = {}
+    for url in urls:
+        parts = parse_wayback_url(url)
+        if parts is None:
+            plan[url] = url
+            continue
+
+        timestamp, modifier, original = parts
+        index = get_index(url_prefix(original), timestamp[:4], fetch)
+
+        if not index.captured_in(original, timestamp[:4]):
+            # A whole listing without it means there is nothing usable to
+            # fetch; otherwise fetch it the old way.
+            plan[url] = None if index.complete else url
+            continue
+
+        capture = index.closest(original, timestamp)
+        if capture is None:
+            plan[url] = None
+        else:
+            plan[url] = "https://web.archive.org/web/%s%s/%s" % (capture[0], modifier, capture[1])
+    return plan
+
+
+if __name__ == "__main__":
+    if len(sys.argv) < 3:
+        print("usage: %s <cdx_file> <wayback_url> [<wayback_url> ...]" % sys.argv[0])
+        sys.exit(1)
+
+    CDX_FILE = sys.argv[1]
+    for requested, resolved in build_fetch_plan(sys.argv[2:], None).items():
+        print("%s -> %s" % (requested, resolved))
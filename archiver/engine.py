@@ -0,0 +1,849 @@
+#!/usr/bin/python3
+
+import argparse
+import base64
+import functools
+import json
+import multiprocessing
+import os
+import re
+import sys
+from concurrent.futures import Future, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+import soupsieve
+from bs4 import BeautifulSoup
+import guestdb
+import metrics
+from boilerplate import load_template
+from fingerprints import Fingerprints, digest, spec_digest
+from guestdb import BatchWriter, guestIndex
+from journal import Journal, script_kind
+from markers import MarkerScanner, cut, from_end, skip_lines
+from normalize import compile_steps, squash_biography
+from parsers import BACKEND, ArchivedPage, page_text
+from quarantine import PageFailure, Quarantine
+from records import FORMATS, write_records
+from specs import SPECS
+from wayback import fetch_content, fetch_later, init_fetch_mode, page_from_content, prefetch_pages, scrape_archived_page
+
+
+# One extraction engine for every year. What used to differ between the
+# year scripts (where the guest list lives, which tags hold the name and the
+# blurb, how the blurb is cleaned, which lines bracket a biography) is data in
+# specs.py; this module turns a spec into guest entries and writes them the
+# way the scripts did. Selectors and cleanup regexes are compiled once.
+#
+# A run is three stages: the wayback thread pool fetches the bio pages, a
+# pool of PARSE_JOBS processes turns each page's bytes into a biography as
+# soon as it arrives, and the main thread is the only one that writes to
+# MySQL, in listing order. ARCHIVER_PARSE_JOBS=1 parses in the main thread.
+#
+# --refresh (or ARCHIVER_REFRESH=1) reruns a spec over the rows it wrote
+# before: pages whose bytes, listing entry, spec and extraction code hash
+# the same as last time are not parsed, and rows are rewritten only when
+# the record's hash changed. See fingerprints.py.
+#
+# --dry-run [DIR] (or ARCHIVER_DRY_RUN=DIR) writes each spec's records to
+# DIR/<year>_<kind>.ndjson (--format parquet for .parquet) instead of
+# MySQL; staging.py merge applies them in bulk.
+#
+#   python3 engine.py [--years 2013-2018,2024] [--kinds scrape_archive_performers] [--list] [--refresh] [--dry-run [DIR]]
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+
+# Blurb backfills update rows the other kinds insert, so they go last.
+KIND_ORDER = ("scrape_archive", "backfill", "scrape_archive_attending", "scrape_archive_performers", "scrape_archive_backfill_blurb")
+
+SKIP_YEAR = "skip"
+
+PARSE_JOBS = int(os.environ.get("ARCHIVER_PARSE_JOBS", "0")) or os.cpu_count() or 1
+
+REFRESH = os.environ.get("ARCHIVER_REFRESH", "0") != "0"
+STAGING_DIR = os.path.join(HERE, "staging")
+REPORT_DIR = os.environ.get("ARCHIVER_REPORT_DIR", os.path.join(HERE, "reports"))
+DRY_RUN = os.environ.get("ARCHIVER_DRY_RUN")
+
+# Stands in for the biography of a page that was not parsed because its
+# source hash had not changed.
+UNCHANGED = object()
+
+
+class ExtractionError(ValueError):
+    pass
+
+
+_selectors = {}
+
+
+def selector(css):
+    if css not in _selectors:
+        _selectors[css] = soupsieve.compile(css)
+    return _selectors[css]
+
+
+def select(tag, css):
+    return selector(css).select(tag)
+
+
+def select_one(tag, css):
+    return selector(css).select_one(tag)
+
+
+def tag_text(tag, mode, name=None):
+    if mode == "text":
+        return tag.get_text()
+    if mode == "stripped":
+        return tag.get_text().strip()
+    if mode == "strip":
+        return tag.get_text(strip=True)
+    if mode == "spaced":
+        return tag.get_text(" ", strip=True)
+    if mode == "parts":
+        # Text of the item with the leading name taken off its first string.
+        parts = list(tag.stripped_strings)
+        if parts and parts[0].startswith(name):
+            parts[0] = parts[0].replace(name, "").strip()
+        return " ".join(parts).strip()
+    raise ValueError("unknown text mode %r" % (mode,))
+
+
+def encode(text):
+    if text is None:
+        return None
+    return base64.b64encode(text.encode("utf-8")).decode("utf-8")
+
+
+def soup_of(page):
+    if isinstance(page, ArchivedPage):
+        return page.soup
+    return page
+
+
+class Extractor:
+
+    def __init__(self, spec):
+        self.spec = spec
+        self.year = spec["year"]
+        self.kind = spec["kind"]
+        self.listing = spec["listing"]
+        self.bio = spec.get("bio")
+        if self.bio and "start" in self.bio:
+            self.markers = MarkerScanner(self.bio["start"], self.bio.get("end", ()), self.bio.get("end_contains", ()), self.bio.get("end_before"))
+        self.template = None
+        if self.bio and "template" in self.bio:
+            self.template = load_template(self.year, self.kind)
+        self.name_fixes = spec.get("name_fixes", {})
+        self.skip_names = set(spec.get("skip_names", ()))
+
+        listing = self.listing
+        self.clean_name = compile_steps(listing.get("name_clean"))
+        description = listing.get("description", {})
+        self.clean_description = compile_steps(description.get("clean"))
+        self.tags = [
+            (re.compile(pattern, flags), re.compile(pattern + r"\s*", flags), year, compile_steps(then))
+            for pattern, year, flags, then in listing.get("tags", ())
+        ]
+        self.clean_tagged = compile_steps(listing.get("subs"))
+        for key in ("container", "containers", "items", "name", "links", "bios", "headings", "category"):
+            if listing.get(key):
+                selector(listing[key])
+        if description.get("select"):
+            selector(description["select"])
+
+    def load_listing(self):
+        filename = self.spec.get("file")
+        if filename is None:
+            return soup_of(scrape_archived_page(self.spec["url"]))
+
+        with open(os.path.join(HERE, filename), "r", encoding="utf-8") as f:
+            html_text = f.read()
+        if self.listing.get("patch_menus"):
+            # Insert </li> after every </menu> that is directly followed by a <li>
+            html_text = re.sub(r"(</menu>)(\s*<li>)", r"\1</li>\2", html_text)
+        return BeautifulSoup(html_text, "html.parser")
+
+    def entries(self, soup):
+        extract = getattr(self, "_" + self.listing["type"])
+        for entry in extract(soup):
+            entry.setdefault("year", self.year)
+            entry["name"] = self.name_fixes.get(entry["name"], entry["name"])
+            if entry["name"] in self.skip_names:
+                continue
+            yield entry
+
+    def _href(self, link):
+        mode = self.listing.get("href")
+        if mode is None:
+            return None
+        if mode == "raw":
+            return link.get("href")
+        if mode == "nospace":
+            return re.sub(r"\s+", "", link.get("href", ""))
+        return link.get("href", "").strip()
+
+    def _items(self, soup):
+        listing = self.listing
+        if listing.get("container"):
+            container = select_one(soup, listing["container"])
+            containers = [container] if container else []
+        elif listing.get("containers"):
+            containers = select(soup, listing["containers"])
+            if listing.get("container_id") == "upper":
+                # Sections with capitalized IDs (A, B, C...)
+                containers = [c for c in containers if c.get("id") and c["id"].isupper()]
+        else:
+            containers = [soup]
+
+        description = listing.get("description", {})
+        for container in containers:
+            for item in select(container, listing["items"]):
+                name_tag = select_one(item, listing["name"])
+                if not name_tag:
+                    continue
+                name = self.clean_name(tag_text(name_tag, listing.get("name_text", "strip")))
+
+                href = None
+                if listing.get("href"):
+                    href = self._href(name_tag)
+                    if href is None:
+                        metrics.info("no link for %s, skipping" % name)
+                        continue
+
+                if description.get("select"):
+                    desc_tag = select_one(item, description["select"])
+                else:
+                    desc_tag = item
+                if desc_tag:
+                    text = tag_text(desc_tag, description.get("text", "spaced"), name)
+                elif description.get("required"):
+                    continue
+                else:
+                    text = description.get("missing", "")
+                blurb = self.clean_description(text, name)
+
+                category = None
+                if listing.get("category"):
+                    category_tag = select_one(item, listing["category"])
+                    category = category_tag.text.strip() if category_tag else None
+
+                yield {"name": name, "href": href, "blurb": blurb, "category": category}
+
+    def _detail_links(self, soup):
+        # Guest links and their blurbs are separate lists on these pages and
+        # are paired up by position.
+        listing = self.listing
+        exclusions = listing["exclusions"]
+
+        def is_valid_bio(text):
+            if not text or len(text.split()) < listing["min_words"]:
+                return False
+            if re.match(r"^\d{4}-\d{2}-\d{2}", text):  # ISO date pattern
+                return False
+            if any(phrase in text.lower() for phrase in exclusions):
+                return False
+            return True
+
+        links = select(soup, listing["links"])
+        bios = [text for text in (p.get_text(" ", strip=True) for p in select(soup, listing["bios"])) if is_valid_bio(text)]
+        for i, link in enumerate(links):
+            name = link.get_text(strip=True)
+            raw_desc = bios[i] if i < len(bios) else ""
+            yield {"name": name, "href": link["href"], "blurb": self.clean_description(raw_desc, name), "category": None}
+
+    def _headings(self, soup):
+        listing = self.listing
+        skip_headers = set(listing["skip_headers"])
+        for tag in select(soup, listing["headings"]):
+            name = tag.text.strip()
+            desc_tag = tag.find_next_sibling("p")
+            description = desc_tag.text.replace("\xa0", " ").strip() if desc_tag else ""
+            description = self.clean_description(description, name)
+            if not description or len(description) < listing["min_length"]:
+                continue
+            if name.lower().strip() in skip_headers:
+                continue
+            if not re.search(r"[.!?]", description):
+                continue
+            yield {"name": name, "href": None, "blurb": description, "category": None}
+
+    def _tagged_index(self, soup):
+        # Past-guest indexes: each blurb may start with a tag such as
+        # "[1998 Guest]" or "[prior-year]" saying which year it belongs to.
+        for item in select(soup, "li"):
+            a_tag = select_one(item, "a")
+            if not a_tag:
+                continue
+            name = a_tag.text.strip().replace("[new]", "").strip()
+            href = self._href(a_tag)
+            full_text = item.get_text(separator=" ", strip=True)
+            blurb = full_text.replace(name, "", 1).strip()
+
+            ex_year = None
+            for pattern, strip_pattern, tag_year, then in self.tags:
+                match = pattern.search(blurb)
+                if match:
+                    ex_year = match.group(1) if tag_year == "group" else tag_year
+                    blurb = then(strip_pattern.sub("", blurb))
+                    break
+            blurb = self.clean_tagged(blurb)
+
+            if ex_year == SKIP_YEAR:
+                continue
+            if ex_year is None:
+                ex_year = self.year
+            yield {"name": name, "href": href, "blurb": blurb, "category": None, "year": ex_year}
+
+    def biography(self, page, name):
+        return self.text_biography(page_text(page), name)
+
+    def text_biography(self, body_text, name):
+        bio = self.bio
+        if self.template is not None:
+            return self._clean_biography(self.template.strip(body_text), name), None
+
+        if "slice" in bio:
+            first, last = bio["slice"]
+            filtered_text = cut(body_text, skip_lines(body_text, 0, first), from_end(body_text, last))
+            return self._clean_biography(filtered_text, name), None
+
+        # The last window lines are never markers.
+        limit = from_end(body_text, bio.get("window", 1))
+        marker, guest_type, end = self.markers.scan(body_text, 0 if limit is None else limit - 1)
+
+        if end is None and bio.get("missing_end") == "none":
+            return None, None
+        if marker is None and bio.get("missing_start") == "top":
+            marker = start = 0
+        elif marker is not None:
+            start = skip_lines(body_text, marker, bio.get("start_offset", 2))
+        if marker is None or end is None:
+            raise ExtractionError("biography markers not found for %s" % name)
+
+        return self._clean_biography(cut(body_text, start, end), name), guest_type
+
+    def _clean_biography(self, text, name):
+        with metrics.stage("normalize"):
+            biography = text.replace("\n", " ")
+            if self.bio.get("clean") != "squash":
+                return biography
+            return squash_biography(biography, name, self.bio.get("drop_replacement_char"))
+
+
+def guest_row(spec, entry, bio_link, biography, guest_type):
+    # The yearly_guests row for an entry, minus guest_id, text not yet encoded.
+    if spec.get("null_empty_biography") and biography == "":
+        biography = None
+    blurb = entry["blurb"]
+    if spec.get("blurb_column") == "biography":
+        # These years stored the listing blurb in the biography column.
+        biography, blurb = blurb, biography
+    return {
+        "year": entry["year"],
+        "guest_name": entry["name"],
+        "url": bio_link,
+        "biography": biography,
+        "blurb": blurb,
+        "guest_category": entry["category"],
+        "guest_type": guest_type or spec.get("guest_type"),
+    }
+
+
+def bio_pages(spec):
+    # (entry, page) for every bio page the spec's listing links to, each
+    # page once.
+    extractor = Extractor(dict(spec, bio=None))
+    soup = extractor.load_listing()
+    if soup is None:
+        return
+    links = {}
+    for entry in extractor.entries(soup):
+        links.setdefault(spec.get("people_url") + entry["href"], entry)
+    prefetch_pages(links)
+    for link, entry in links.items():
+        content, resolved = fetch_content(link)
+        page = page_from_content(content, resolved)
+        if page is not None:
+            yield entry, page
+
+
+def extract_records(spec, prefetch=False, parallel=False, dead=None):
+    # Everything a run of the spec would write, for every entry on the
+    # listing, without MySQL or the journal. Pages are parsed in this
+    # process, or in the parse pool when parallel is set. A page that fails
+    # goes to the quarantine dead and its entry is left out; without one,
+    # the error is raised. Returns the rows and the number of pages parsed.
+    extractor = Extractor(spec)
+    with metrics.stage("listing"):
+        soup = extractor.load_listing()
+        if soup is None:
+            return [], 0
+        entries = list(extractor.entries(soup))
+
+    pages = 1
+    rows = []
+    fetching = extractor.bio and spec.get("mode") != "update_blurb"
+    pool = parse_pool() if parallel and fetching else None
+    if prefetch and fetching:
+        prefetch_pages([spec.get("people_url") + entry["href"] for entry in entries])
+    parsing = {}
+    if pool is not None:
+        for index, entry in enumerate(entries):
+            parsing[index] = parse_later(pool, spec, spec.get("people_url") + entry["href"], entry["name"])
+    for index, entry in enumerate(entries):
+        if spec.get("mode") == "update_blurb":
+            rows.append({"year": entry["year"], "guest_name": entry["name"], "blurb": entry["blurb"]})
+            continue
+        biography = guest_type = bio_link = None
+        if extractor.bio:
+            bio_link = spec.get("people_url") + entry["href"]
+            try:
+                if pool is not None:
+                    with metrics.stage("wait"):
+                        biography, guest_type, page_hash = parsing.pop(index).result()
+                else:
+                    biography, guest_type, page_hash = parse_now(extractor, None, entry, bio_link, False)
+            except PageFailure as failure:
+                if dead is None:
+                    raise failure.error
+                metrics.warning("%s %s: %s, quarantined" % (entry["year"], entry["name"], failure))
+                dead.put(entry, bio_link, failure)
+                metrics.count("quarantined")
+                continue
+            pages += page_hash is not None
+        rows.append(guest_row(spec, entry, bio_link, biography, guest_type))
+    return rows, pages
+
+
+def dry_run(spec, directory, file_format="ndjson"):
+    # Writes the spec's records to directory/<year>_<kind>.<format> instead
+    # of MySQL; staging.py merge applies them later.
+    stats = metrics.begin(spec["year"], spec["kind"])
+    if spec.get("mode") == "update_blurb":
+        metrics.info("%s %s: blurb backfill, nothing to stage" % (spec["year"], spec["kind"]))
+        return None
+    path = os.path.join(directory, "%s_%s.%s" % (spec["year"], spec["kind"], file_format))
+    # Failing pages are kept next to the staging files, not in the live
+    # quarantine: reprocess would write them to MySQL. Each dry run redoes
+    # the whole year, so what an earlier one set aside is cleared first.
+    dead = Quarantine(spec["year"], spec["kind"], os.path.join(directory, "quarantine"))
+    for item in dead.items():
+        dead.remove(item)
+    rows, pages = extract_records(spec, prefetch=True, parallel=True, dead=dead)
+    stats.count("staged", write_records(path, rows))
+    metrics.info("%s %s: %s records from %s pages to %s" % (spec["year"], spec["kind"], len(rows), pages, path))
+    if stats.counters.get("quarantined"):
+        metrics.warning("%s %s: %s pages left out and quarantined in %s" % (spec["year"], spec["kind"], stats.counters["quarantined"], dead.path))
+    stats.report()
+    return path
+
+
+_parse_pool = None
+_worker_extractors = {}
+
+
+def parse_pool():
+    global _parse_pool
+    if _parse_pool is None and PARSE_JOBS > 1:
+        # Forked so the year scripts aren't re-run as the workers' __main__,
+        # and started right away, before the fetch threads exist.
+        _parse_pool = ProcessPoolExecutor(max_workers=PARSE_JOBS, mp_context=multiprocessing.get_context("fork"))
+        _parse_pool.submit(int).result()
+    return _parse_pool
+
+
+def drop_parse_pool(pool):
+    # A worker died. The pool can't take work any more, so the rest of this
+    # run quarantines its pages and the next parse_pool() forks a new one.
+    global _parse_pool
+    if _parse_pool is pool:
+        _parse_pool = None
+        metrics.warning("a parse worker died, the parse pool is restarted for the next spec")
+    pool.shutdown(wait=False)
+
+
+def _parse_biography(year, kind, resolved, content, name):
+    # Runs in a parse worker; keeps one Extractor per spec. The worker's
+    # stage timings go back with the result.
+    key = (year, kind)
+    if key not in _worker_extractors:
+        _worker_extractors[key] = Extractor(find_spec(year, kind))
+    timings = metrics.begin()
+    biography = guest_type = None
+    with timings.stage("parse"):
+        user_soup = page_from_content(content, resolved)
+        if user_soup is not None:
+            biography, guest_type = _worker_extractors[key].biography(user_soup, name)
+    return biography, guest_type, timings.export()[0]
+
+
+def parse_later(pool, spec, bio_link, name, unchanged=None):
+    # Future for (biography, guest_type, page_hash), parsed as soon as the
+    # page is in. A page whose hash unchanged() accepts is not parsed; its
+    # biography comes back as UNCHANGED. Fetch and parse errors come back
+    # as PageFailure.
+    parsed = Future()
+    resolved, fetched = fetch_later(bio_link)
+    if fetched is None:
+        parsed.set_result((None, None, None))
+        return parsed
+
+    def hand_off(fetched):
+        error = fetched.exception()
+        if error is not None:
+            parsed.set_exception(PageFailure(error, resolved))
+            return
+        content = fetched.result()
+        page_hash = digest(content)
+        if content is None:
+            parsed.set_result((None, None, None))
+        elif unchanged is not None and unchanged(page_hash):
+            parsed.set_result((UNCHANGED, None, page_hash))
+        else:
+            # Errors raised in a done callback are only logged, and the
+            # writer would wait on parsed for good.
+            try:
+                job = pool.submit(_parse_biography, spec["year"], spec["kind"], resolved, content, name)
+            except Exception as error:
+                if isinstance(error, BrokenProcessPool):
+                    drop_parse_pool(pool)
+                parsed.set_exception(PageFailure(error, resolved, content))
+                return
+
+            def forward(job):
+                error = job.exception()
+                if error is not None:
+                    if isinstance(error, BrokenProcessPool):
+                        drop_parse_pool(pool)
+                    parsed.set_exception(PageFailure(error, resolved, content))
+                    return
+                biography, guest_type, timers = job.result()
+                metrics.current().merge(timers)
+                parsed.set_result((biography, guest_type, page_hash))
+
+            job.add_done_callback(forward)
+
+    fetched.add_done_callback(hand_off)
+    return parsed
+
+
+def run(spec, refresh=False):
+    extractor = Extractor(spec)
+    progress = Journal(spec["year"], spec["kind"])
+    prints = Fingerprints(spec["year"], spec["kind"], spec_digest(spec, BACKEND, extractor.template and extractor.template.digest))
+    dead = Quarantine(spec["year"], spec["kind"])
+    db_user, db_password, db = guestdb.DB_USER, guestdb.DB_PASSWORD, guestdb.DB_NAME
+    people_url = spec.get("people_url")
+    updating = spec.get("mode") == "update_blurb"
+    stats = metrics.begin(spec["year"], spec["kind"])
+
+    metrics.info("%s %s: %s" % (spec["year"], spec["kind"], spec.get("file") or spec["url"]))
+    with stats.stage("listing"):
+        soup = extractor.load_listing()
+        if soup is None:
+            metrics.warning("no listing page for %s %s, skipping" % (spec["year"], spec["kind"]))
+            stats.report()
+            return
+        # A refresh goes over journaled guests again; the fingerprints decide.
+        entries = [entry for entry in extractor.entries(soup) if refresh or not progress.is_done(entry["name"], year=entry["year"])]
+    stats.count("entries", len(entries))
+    if updating:
+        try:
+            backfill_blurbs(spec, entries, progress, prints, refresh)
+        finally:
+            stats.report()
+        return
+
+    guests = guestIndex(db_user, db_password, db)
+    # All of the year's new names in one round of allocation.
+    guests.add_guests([entry["name"] for entry in entries])
+    parsing = {}
+    if extractor.bio:
+        pool = parse_pool()
+        # Rows already in yearly_guests are left as they are, so their pages
+        # are not fetched at all, except on a refresh of rows this kind wrote.
+        fetching = [(index, entry) for index, entry in enumerate(entries) if needs_page(guests, prints, entry, refresh)]
+        prefetch_pages([people_url + entry["href"] for _, entry in fetching])
+        if pool is not None:
+            for index, entry in fetching:
+                unchanged = None
+                if refresh:
+                    unchanged = functools.partial(page_unchanged, prints, entry)
+                parsing[index] = parse_later(pool, spec, people_url + entry["href"], entry["name"], unchanged)
+
+    writer = BatchWriter(db_user, db_password, db)
+    try:
+        for index, entry in enumerate(entries):
+            stats.count(write_entry(spec, extractor, entry, parsing.pop(index, None), guests, writer, progress, prints, dead, refresh))
+    finally:
+        # Whatever was written before an error or a stop is still committed.
+        writer.flush()
+        report_quarantined(spec, dead)
+        stats.report()
+
+
+def needs_page(guests, prints, entry, refresh):
+    guest_id = guests.guest_id(entry["name"])
+    if guest_id is None or not guests.has_year(guest_id, entry["year"]):
+        return True
+    return refresh and prints.get(entry["name"], entry["year"]) is not None and not guests.is_moderated(guest_id, entry["year"])
+
+
+def report_quarantined(spec, dead):
+    quarantined = metrics.current().counters.get("quarantined", 0)
+    if quarantined:
+        metrics.warning("%s %s: %s pages quarantined in %s, retry them with archiver.py reprocess" % (spec["year"], spec["kind"], quarantined, dead.path))
+
+
+def reprocess(spec, refetch=False):
+    # Retries the spec's quarantined pages, from the stored bytes unless
+    # refetch is set, and drops the ones that now go through. Refetched
+    # pages skip the snapshot cache, which holds the bytes that failed.
+    extractor = Extractor(spec)
+    progress = Journal(spec["year"], spec["kind"])
+    prints = Fingerprints(spec["year"], spec["kind"], spec_digest(spec, BACKEND, extractor.template and extractor.template.digest))
+    dead = Quarantine(spec["year"], spec["kind"])
+    db_user, db_password, db = guestdb.DB_USER, guestdb.DB_PASSWORD, guestdb.DB_NAME
+    stats = metrics.begin(spec["year"], spec["kind"])
+    items = dead.items()
+    if not items:
+        return 0
+
+    metrics.info("%s %s: reprocessing %s quarantined pages" % (spec["year"], spec["kind"], len(items)))
+    guests = guestIndex(db_user, db_password, db)
+    guests.add_guests([item["entry"]["name"] for item in items])
+    outcomes = []
+    writer = BatchWriter(db_user, db_password, db)
+    try:
+        for item in items:
+            parsed = None
+            content = None if refetch else dead.content(item)
+            if refetch:
+                parsed = Future()
+                try:
+                    parsed.set_result(parse_now(extractor, None, item["entry"], item["bio_link"], False, use_cache=False))
+                except PageFailure as failure:
+                    parsed.set_exception(failure)
+            elif content is not None:
+                parsed = Future()
+                try:
+                    with stats.stage("parse"):
+                        user_soup = page_from_content(content, item["resolved"])
+                        parsed.set_result(extractor.biography(user_soup, item["entry"]["name"]) + (digest(content),))
+                except Exception as error:
+                    parsed.set_exception(PageFailure(error, item["resolved"], content))
+            outcome = write_entry(spec, extractor, item["entry"], parsed, guests, writer, progress, prints, dead)
+            stats.count(outcome)
+            outcomes.append((item, outcome))
+    finally:
+        writer.flush()
+    for item, outcome in outcomes:
+        if outcome != "quarantined":
+            dead.remove(item)
+    report_quarantined(spec, dead)
+    stats.report()
+    return len(dead.items())
+
+
+def backfill_blurbs(spec, entries, progress, prints, refresh=False):
+    # All of the listing's blurbs go to MySQL as one staged update. Names
+    # that don't resolve to a guest with a row for the year are reported in
+    # reports/ and left for the next run instead of stopping this one.
+    stats = metrics.current()
+    staged = []
+    for entry in entries:
+        if refresh and prints.unchanged(entry["name"], entry["year"], prints.source(entry)):
+            stats.count("unchanged")
+        else:
+            staged.append(entry)
+
+    db_user, db_password, db = guestdb.DB_USER, guestdb.DB_PASSWORD, guestdb.DB_NAME
+    resolved, unresolved, moderated = guestdb.backfillBlurbs(db_user, db_password, db, [(entry["year"], entry["name"], encode(entry["blurb"])) for entry in staged])
+    for entry in staged:
+        key = (int(entry["year"]), guestdb.name_key(entry["name"]))
+        if key in moderated:
+            # An editor's approved change; the blurb is left as it is.
+            progress.mark_done(entry["name"], year=entry["year"], guest_id=moderated[key])
+            stats.count("moderated")
+            continue
+        guest_id = resolved.get(key)
+        if guest_id is not None:
+            source = prints.source(entry)
+            progress.mark_done(entry["name"], year=entry["year"], guest_id=guest_id)
+            prints.record(entry["name"], entry["year"], source, source)
+            stats.count("blurbs_updated")
+    stats.count("unresolved", len(unresolved))
+    write_unresolved(spec, unresolved)
+
+
+def write_unresolved(spec, unresolved):
+    path = os.path.join(REPORT_DIR, "%s_%s_unresolved.json" % (spec["year"], spec["kind"]))
+    if not unresolved:
+        if os.path.exists(path):
+            os.remove(path)
+        return
+    for year, name, reason in unresolved:
+        metrics.warning("%s %s: %s, not updated" % (year, name, reason))
+    os.makedirs(REPORT_DIR, exist_ok=True)
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump([{"year": year, "name": name, "reason": reason} for year, name, reason in unresolved], f, indent=1, ensure_ascii=False)
+    metrics.warning("%s unresolved names listed in %s" % (len(unresolved), path))
+
+
+def parse_now(extractor, prints, entry, bio_link, owned, use_cache=True):
+    # Fetches and parses in this thread; errors come back as PageFailure.
+    content = resolved = None
+    try:
+        content, resolved = fetch_content(bio_link, use_cache=use_cache)
+        page_hash = digest(content)
+        if owned and page_unchanged(prints, entry, page_hash):
+            return UNCHANGED, None, page_hash
+        with metrics.stage("parse"):
+            user_soup = page_from_content(content, resolved)
+            if user_soup is None:
+                return None, None, page_hash
+            return extractor.biography(user_soup, entry["name"]) + (page_hash,)
+    except Exception as error:
+        raise PageFailure(error, resolved, content) from error
+
+
+def page_unchanged(prints, entry, page_hash):
+    return prints.unchanged(entry["name"], entry["year"], prints.source(entry, page_hash))
+
+
+def write_entry(spec, extractor, entry, parsed, guests, writer, progress, prints, dead, refresh=False):
+    # Returns what became of the entry, counted in the run's stats.
+    name = entry["name"]
+    year = entry["year"]
+    if not refresh and progress.is_done(name, year=year):
+        return "journaled"
+    done = functools.partial(progress.mark_done, name, year=year)
+
+    guest_id = guests.guest_id(name)
+    if guest_id is None:
+        guest_id = guests.add_guest(name)
+
+    metrics.debug("got guest_id: %s" % guest_id)
+    guest_exists = guests.has_year(guest_id, year)
+    metrics.debug("guest_exists for %s in %s is %s" % (name, year, guest_exists))
+    # Rows this kind wrote before; a refresh may rewrite only these.
+    owned = refresh and guest_exists and prints.get(name, year) is not None
+
+    def committed(source, record):
+        done(guest_id=guest_id)
+        prints.record(name, year, source, record)
+
+    if guest_exists and not owned:
+        done(guest_id=guest_id)
+        return "already_there"
+    if owned and guests.is_moderated(guest_id, year):
+        # An editor's approved change; refreshes leave it alone.
+        done(guest_id=guest_id)
+        return "moderated"
+
+    biography = guest_type = bio_link = page_hash = None
+    if extractor.bio:
+        bio_link = spec.get("people_url") + entry["href"]
+        try:
+            if parsed is not None:
+                with metrics.stage("wait"):
+                    biography, guest_type, page_hash = parsed.result()
+            if parsed is None or (biography is UNCHANGED and not owned):
+                # Parsed here, also when the row of an unchanged page is gone.
+                biography, guest_type, page_hash = parse_now(extractor, prints, entry, bio_link, owned)
+        except PageFailure as failure:
+            metrics.warning("%s %s: %s, quarantined" % (year, name, failure))
+            dead.put(entry, bio_link, failure)
+            return "quarantined"
+
+    source = prints.source(entry, page_hash)
+    if owned and prints.unchanged(name, year, source):
+        done(guest_id=guest_id)
+        return "unchanged"
+
+    row = guest_row(spec, entry, bio_link, biography, guest_type)
+    record = digest(row)
+    if owned and prints.get(name, year)["record"] == record:
+        # Different page bytes, same record.
+        committed(source, record)
+        return "unchanged"
+    row["guest_id"] = guest_id
+    row["biography"] = encode(row["biography"])
+    row["blurb"] = encode(row["blurb"])
+    metrics.debug("bio: %s" % row["biography"])
+    metrics.debug("blurb: %s" % row["blurb"])
+    if owned:
+        writer.update(row, done=functools.partial(committed, source, record))
+        return "rewritten"
+    writer.insert(row, done=functools.partial(committed, source, record))
+    guests.add_year(guest_id, year)
+    return "inserted"
+
+
+def find_spec(year, kind):
+    for spec in SPECS:
+        if spec["year"] == year and spec["kind"] == kind:
+            return spec
+    raise KeyError("no spec for %s %s" % (year, kind))
+
+
+def add_run_options(parser):
+    parser.add_argument("--refresh", action="store_true", default=REFRESH, help="rewrite this kind's rows whose pages or extraction changed")
+    parser.add_argument("--dry-run", nargs="?", const=STAGING_DIR, default=DRY_RUN, metavar="DIR", help="write records to DIR instead of MySQL (default %s)" % STAGING_DIR)
+    parser.add_argument("--format", choices=FORMATS, default="ndjson", help="staging file format for --dry-run")
+
+
+def run_with(spec, options):
+    if options.dry_run:
+        dry_run(spec, options.dry_run, options.format)
+    else:
+        run(spec, refresh=options.refresh)
+
+
+def run_script(script_path):
+    # Entry point for the per-year scripts, e.g. 2016_scrape_archive_attending.py.
+    init_fetch_mode()
+    parser = argparse.ArgumentParser(add_help=False)
+    add_run_options(parser)
+    options, _ = parser.parse_known_args()
+    name = os.path.splitext(os.path.basename(script_path))[0]
+    run_with(find_spec(int(name[:4]), script_kind(script_path)), options)
+
+
+def parse_years(value):
+    years = set()
+    for part in value.split(","):
+        if "-" in part:
+            first, last = part.split("-", 1)
+            years.update(range(int(first), int(last) + 1))
+        elif part:
+            years.add(int(part))
+    return years
+
+
+def select_specs(years=None, kinds=None):
+    chosen = [spec for spec in SPECS if (not years or spec["year"] in years) and (not kinds or spec["kind"] in kinds)]
+    return sorted(chosen, key=lambda spec: (spec["year"], KIND_ORDER.index(spec["kind"])))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Run archiver extraction specs in one process.")
+    parser.add_argument("--years", type=parse_years, help="e.g. 1997-2003,2017")
+    parser.add_argument("--kinds", type=lambda value: set(value.split(",")), help="e.g. scrape_archive,scrape_archive_attending")
+    parser.add_argument("--list", action="store_true", help="list the matching specs and exit")
+    add_run_options(parser)
+    args, _ = parser.parse_known_args(argv)
+
+    specs = select_specs(args.years, args.kinds)
+    if args.list:
+        for spec in specs:
+            print("%s %s" % (spec["year"], spec["kind"]))
+        return 0
+
+    init_fetch_mode(argv)
+    for spec in specs:
+        run_with(spec, args)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,139 @@
+#!/usr/bin/python3
+
+import ast
+import hashlib
+import json
+import os
+import threading
+
+
+# Content hashes for incremental reruns. There is one file per (year, script
+# kind) like the journal's, e.g. fingerprints/2016_scrape_archive.jsonl,
+# holding for each guest the hash of what the record was built from (the
+# spec, the extraction code, the listing entry and the bio page's bytes)
+# and the hash of the record itself. A refresh run skips parsing a page
+# whose source hash is unchanged, and writes a record only when its hash
+# differs. A guest is in the file only once this kind has written their
+# row, so refreshes leave rows written by other kinds alone.
+#
+# Append-only: the last line for a guest wins, and the file is compacted
+# when it is loaded.
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+FINGERPRINT_DIR = os.environ.get("ARCHIVER_FINGERPRINT_DIR", os.path.join(HERE, "fingerprints"))
+
+# The code a page's record is extracted with: whole modules, or the named
+# top-level definitions of modules that also do other things, so that a
+# logging or scheduling edit doesn't force a full reparse.
+EXTRACTION_SOURCES = {
+    "boilerplate.py": None,
+    "engine.py": ("SKIP_YEAR", "ExtractionError", "selector", "select", "select_one", "tag_text", "Extractor", "guest_row"),
+    "markers.py": None,
+    "normalize.py": None,
+    "parsers.py": None,
+    "wayback.py": ("WAYBACK_HREF", "TOOLBAR_IDS", "TOOLBAR_INSERT", "TOOLBAR_ID", "_bare_host", "_relative_href", "_strip_toolbar", "normalize_snapshot", "page_from_content"),
+}
+
+
+def digest(value):
+    if value is None:
+        return None
+    if not isinstance(value, bytes):
+        value = json.dumps(value, sort_keys=True, ensure_ascii=False).encode("utf-8")
+    return hashlib.sha256(value).hexdigest()
+
+
+def source_digest(filename, names=None):
+    with open(os.path.join(HERE, filename), "rb") as f:
+        source = f.read()
+    if names is None:
+        return digest(source)
+
+    source = source.decode("utf-8")
+    found = {}
+    for node in ast.parse(source).body:
+        if isinstance(node, (ast.FunctionDef, ast.ClassDef)):
+            defined = [node.name]
+        elif isinstance(node, ast.Assign):
+            defined = [target.id for target in node.targets if isinstance(target, ast.Name)]
+        else:
+            continue
+        for name in defined:
+            if name in names:
+                found[name] = ast.get_source_segment(source, node)
+    missing = set(names) - set(found)
+    if missing:
+        # Renamed or moved; the list above needs updating.
+        raise KeyError("%s no longer defines %s" % (filename, ", ".join(sorted(missing))))
+    return digest([found[name] for name in names])
+
+
+def spec_digest(spec, backend=None, template=None):
+    sources = [source_digest(filename, names) for filename, names in sorted(EXTRACTION_SOURCES.items())]
+    if template is None:
+        return digest([spec, sources, backend])
+    # The boilerplate template a spec's biographies are cut with.
+    return digest([spec, sources, backend, template])
+
+
+class Fingerprints:
+
+    def __init__(self, year, kind, spec_hash=None, directory=None):
+        self.path = os.path.join(directory or FINGERPRINT_DIR, "%s_%s.jsonl" % (year, kind))
+        self.year = year
+        self.spec_hash = spec_hash
+        self.lock = threading.Lock()
+        self.entries = {}
+        self._file = None
+        self._load()
+
+    def _key(self, name, year):
+        return (str(self.year if year is None else year), name)
+
+    def _load(self):
+        if not os.path.exists(self.path):
+            return
+
+        lines = 0
+        with open(self.path, "r", encoding="utf-8") as f:
+            for line in f:
+                lines += 1
+                try:
+                    entry = json.loads(line)
+                except ValueError:
+                    # A torn final line; compacting drops it.
+                    continue
+                self.entries[self._key(entry["name"], entry["year"])] = entry
+        if lines > len(self.entries):
+            self._compact()
+
+    def _compact(self):
+        partial = self.path + ".tmp"
+        with open(partial, "w", encoding="utf-8") as f:
+            for entry in self.entries.values():
+                f.write(json.dumps(entry, ensure_ascii=False) + "\n")
+        os.replace(partial, self.path)
+
+    def source(self, entry, page_hash=None):
+        # What a record is built from: spec and code, listing entry, page.
+        return digest([self.spec_hash, entry, page_hash])
+
+    def get(self, name, year=None):
+        return self.entries.get(self._key(name, year))
+
+    def unchanged(self, name, year, source):
+        entry = self.get(name, year)
+        return entry is not None and entry["source"] == source
+
+    def record(self, name, year, source, record):
+        key = self._key(name, year)
+        entry = {"year": key[0], "name": name, "source": source, "record": record}
+        with self.lock:
+            if self.entries.get(key) == entry:
+                return
+            if self._file is None:
+                os.makedirs(os.path.dirname(self.path), exist_ok=True)
+                self._file = open(self.path, "a", encoding="utf-8")
+            self._file.write(json.dumps(entry, ensure_ascii=False) + "\n")
+            self._file.flush()
+            self.entries[key] = entry
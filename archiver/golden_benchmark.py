@@ -0,0 +1,103 @@
+#!/usr/bin/python3
+
+import argparse
+import json
+import multiprocessing
+import os
+import resource
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+import engine
+import snapshot_cache
+import wayback
+
+
+# Runs every year's extraction against locally stored snapshots and checks
+# the records against the golden files under golden/ (or ARCHIVER_GOLDEN_DIR).
+# Pages are served only from the snapshot cache or a recorded bundle, never
+# the network; a page missing from it fails that year. Each spec runs in its
+# own forked process so the peak RSS reported is that year's alone. Years
+# without a golden file are skipped until one is recorded. Exits non-zero
+# if any checked year's records drift from its golden file or fail to
+# extract. --update (re)writes the golden files from the current output.
+#
+#   python3 golden_benchmark.py [--replay BUNDLE] [--years 2013-2018] [--kinds scrape_archive] [--update]
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+GOLDEN_DIR = os.environ.get("ARCHIVER_GOLDEN_DIR", os.path.join(HERE, "golden"))
+
+
+def golden_path(spec):
+    return os.path.join(GOLDEN_DIR, "%s_%s.json" % (spec["year"], spec["kind"]))
+
+
+def measure(year, kind):
+    # Runs in a fresh child process.
+    spec = engine.find_spec(year, kind)
+    start = time.perf_counter()
+    rows, pages = engine.extract_records(spec)
+    elapsed = time.perf_counter() - start
+    peak_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+    return rows, pages, elapsed, peak_rss
+
+
+def first_drift(golden, rows):
+    for index, (want, have) in enumerate(zip(golden, rows)):
+        if want != have:
+            fields = [field for field in sorted(set(want) | set(have)) if want.get(field) != have.get(field)]
+            return "record %s (%s) differs in %s" % (index, have.get("guest_name"), ", ".join(fields))
+    if len(golden) != len(rows):
+        return "%s records, golden has %s" % (len(rows), len(golden))
+    return None
+
+
+def check(spec, update):
+    path = golden_path(spec)
+    if not update and not os.path.exists(path):
+        print("%-4s %-30s skipped, no golden file, record one with --update" % (spec["year"], spec["kind"]))
+        return None
+
+    with ProcessPoolExecutor(max_workers=1, mp_context=multiprocessing.get_context("fork")) as pool:
+        try:
+            rows, pages, elapsed, peak_rss = pool.submit(measure, spec["year"], spec["kind"]).result()
+        except Exception as e:
+            print("%-4s %-30s FAILED %s: %s" % (spec["year"], spec["kind"], type(e).__name__, e))
+            return False
+
+    if update:
+        os.makedirs(GOLDEN_DIR, exist_ok=True)
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(rows, f, indent=1, ensure_ascii=False)
+        status = "updated"
+    else:
+        with open(path, encoding="utf-8") as f:
+            status = first_drift(json.load(f), rows) or "ok"
+
+    rate = pages / elapsed if elapsed else 0
+    print("%-4s %-30s %5s records %5s pages %7.1f pages/s %7.1f MB peak  %s" % (spec["year"], spec["kind"], len(rows), pages, rate, peak_rss / 1e6, status))
+    return status in ("ok", "updated")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark every year's extraction against local snapshots and golden records.")
+    parser.add_argument("--replay", metavar="BUNDLE", default=snapshot_cache.CACHE_DIR, help="snapshot cache or recorded bundle to serve pages from")
+    parser.add_argument("--years", type=engine.parse_years, help="e.g. 2013-2018")
+    parser.add_argument("--kinds", type=lambda value: set(value.split(",")), help="e.g. scrape_archive,scrape_archive_attending")
+    parser.add_argument("--update", action="store_true", help="write the current records as the new golden files")
+    args = parser.parse_args(argv)
+
+    wayback.init_fetch_mode(["--replay", args.replay])
+    failed = skipped = 0
+    for spec in engine.select_specs(args.years, args.kinds):
+        passed = check(spec, args.update)
+        if passed is None:
+            skipped += 1
+        elif not passed:
+            failed += 1
+    print("%s specs failed, %s skipped without a golden file" % (failed, skipped))
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
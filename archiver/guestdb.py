@@ -0,0 +1,278 @@
+#!/usr/bin/python3
+
+import os
+import pymysql
+import unicodedata
+import metrics
+
+
+# MySQL helpers shared by the extraction engine. These are the functions
+# every year script used to carry its own copy of. A run keeps one
+# connection open for all of them, and GuestIndex preloads the guest ids and
+# the (guest_id, year) rows that already exist, so looking a guest up costs
+# no query; only the writes go to MySQL. New guests are allocated through
+# the unique guests.guest_key (database/migrations/001_guest_key.sql), so
+# workers running different years at once can share the guests table.
+
+DB_HOST = os.environ.get("ARCHIVER_DB_HOST", "127.0.0.1")
+DB_USER = os.environ.get("ARCHIVER_DB_USER", "user")
+DB_PASSWORD = os.environ.get("ARCHIVER_DB_PASSWORD", "pass")
+DB_NAME = os.environ.get("ARCHIVER_DB_NAME", "dbname")
+BATCH_SIZE = int(os.environ.get("ARCHIVER_BATCH_SIZE", "100"))
+
+# A row that is already there (uniq_guest_year) is left as it is, edits included.
+INSERT_YEARLY_GUEST = ("INSERT INTO yearly_guests (year, guest_id, guest_name, url, biography, blurb, guest_category, guest_type) VALUES (%s, %s, %s, %s, %s, %s, %s, %s)"
+                       " ON DUPLICATE KEY UPDATE guest_id = guest_id")
+# Refresh runs rewrite rows their own kind wrote before, but never one an
+# editor's approved change marked modified (api/moderation.py).
+UPDATE_YEARLY_GUEST = ("UPDATE yearly_guests SET guest_name = %s, url = %s, biography = %s, blurb = %s, guest_category = %s, guest_type = %s"
+                       " WHERE year = %s and guest_id = %s AND modified = 0")
+
+# uniq_guest_key decides who owns a name, so workers allocating the same new
+# guest at once both get the one row. LAST_INSERT_ID(guest_id) makes
+# lastrowid the existing id when the name was already there.
+ALLOCATE_GUEST = "INSERT INTO guests (guest_name, guest_key) VALUES (%s, %s) ON DUPLICATE KEY UPDATE guest_id = LAST_INSERT_ID(guest_id)"
+INSERT_GUESTS = "INSERT INTO guests (guest_name, guest_key) VALUES (%s, %s) ON DUPLICATE KEY UPDATE guest_id = guest_id"
+CLAIM_GUEST_KEY = "UPDATE IGNORE guests SET guest_key = %s WHERE guest_id = %s AND guest_key IS NULL"
+
+# Blurb backfills stage a year's (name, blurb) pairs and apply them with one
+# join instead of an UPDATE per guest.
+CREATE_BLURB_STAGING = """CREATE TEMPORARY TABLE blurb_staging (
+  `year` int NOT NULL,
+  `guest_name` varchar(512) NOT NULL,
+  `guest_key` varchar(512) CHARACTER SET utf8mb4 COLLATE utf8mb4_bin NOT NULL,
+  `blurb` text,
+  PRIMARY KEY (`year`, `guest_key`)
+) DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_0900_ai_ci"""
+DROP_BLURB_STAGING = "DROP TEMPORARY TABLE IF EXISTS blurb_staging"
+INSERT_BLURB_STAGING = "INSERT INTO blurb_staging (year, guest_name, guest_key, blurb) VALUES (%s, %s, %s, %s)"
+RESOLVE_BLURBS = """SELECT s.year, s.guest_key, s.guest_name, g.guest_id, y.guest_id IS NOT NULL, y.modified
+FROM blurb_staging s
+LEFT JOIN guests g ON g.guest_key = s.guest_key
+LEFT JOIN yearly_guests y ON y.guest_id = g.guest_id AND y.year = s.year"""
+APPLY_BLURBS = """UPDATE yearly_guests y
+JOIN guests g ON g.guest_id = y.guest_id
+JOIN blurb_staging s ON s.guest_key = g.guest_key AND s.year = y.year
+SET y.blurb = s.blurb
+WHERE y.modified = 0"""
+
+
+_connection = None
+_index = None
+
+
+def getConnection(db_user, db_password, db):
+    global _connection
+    if _connection is None or not _connection.open:
+        _connection = pymysql.connect(host=DB_HOST, user=db_user, password=db_password, database=db, charset="utf8mb4")
+    return _connection
+
+
+def yearlyGuestValues(row):
+    return (row["year"], row["guest_id"], row["guest_name"], row["url"], row["biography"], row["blurb"], row["guest_category"], row["guest_type"])
+
+
+def yearlyGuestUpdateValues(row):
+    return (row["guest_name"], row["url"], row["biography"], row["blurb"], row["guest_category"], row["guest_type"], row["year"], row["guest_id"])
+
+
+class BatchWriter:
+    # Buffers yearly_guests inserts and rewrites and writes them with
+    # executemany, BATCH_SIZE at a time, one transaction per batch. Each
+    # write's done callback (the journal mark) runs only once its batch is
+    # committed. Call flush() when the run ends, also on errors.
+
+    def __init__(self, db_user, db_password, db, batch_size=BATCH_SIZE):
+        self.db_user, self.db_password, self.db = db_user, db_password, db
+        self.batch_size = max(1, batch_size)
+        self.inserts = []
+        self.rewrites = []
+        self.done = []
+
+    def insert(self, row, done=None):
+        self.inserts.append(yearlyGuestValues(row))
+        self._added(done)
+
+    def update(self, row, done=None):
+        self.rewrites.append(yearlyGuestUpdateValues(row))
+        self._added(done)
+
+    def _added(self, done):
+        if done is not None:
+            self.done.append(done)
+        if len(self.inserts) + len(self.rewrites) >= self.batch_size:
+            self.flush()
+
+    def flush(self):
+        if not self.inserts and not self.rewrites:
+            return
+        with metrics.stage("db"):
+            con = getConnection(self.db_user, self.db_password, self.db)
+            cur = con.cursor()
+            try:
+                if self.inserts:
+                    cur.executemany(INSERT_YEARLY_GUEST, self.inserts)
+                if self.rewrites:
+                    cur.executemany(UPDATE_YEARLY_GUEST, self.rewrites)
+                con.commit()
+            except Exception:
+                con.rollback()
+                raise
+            finally:
+                cur.close()
+        metrics.info("committed %s inserts and %s rewrites" % (len(self.inserts), len(self.rewrites)))
+        done = self.done
+        self.inserts, self.rewrites, self.done = [], [], []
+        for callback in done:
+            callback()
+
+
+def name_key(guest_name):
+    # guest_name compares under utf8mb4_0900_ai_ci: case and accents don't
+    # count, trailing spaces do. guests.guest_key holds this form.
+    decomposed = unicodedata.normalize("NFKD", guest_name)
+    return "".join(char for char in decomposed if not unicodedata.combining(char)).casefold()
+
+
+def allocateGuestIds(db_user, db_password, db, guest_names):
+    # guest_name -> guest_id for every name, inserting the new ones. One
+    # name is a single statement; many take one multi-row insert and one
+    # select, whatever other workers are allocating at the same time.
+    spellings = {}
+    for guest_name in guest_names:
+        spellings.setdefault(name_key(guest_name), guest_name)
+    if not spellings:
+        return {}
+
+    metrics.count("new_guests", len(spellings))
+    with metrics.stage("db"):
+        con = getConnection(db_user, db_password, db)
+        cur = con.cursor()
+        if len(spellings) == 1:
+            (key, guest_name), = spellings.items()
+            cur.execute(ALLOCATE_GUEST, (guest_name, key))
+            metrics.debug("Query executed: %s" % cur._last_executed)
+            guest_ids = {key: cur.lastrowid}
+        else:
+            cur.executemany(INSERT_GUESTS, [(guest_name, key) for key, guest_name in spellings.items()])
+            metrics.info("allocated %s guest names" % len(spellings))
+            keys = list(spellings)
+            cur.execute("SELECT guest_key, guest_id FROM guests WHERE guest_key IN (%s)" % ", ".join(["%s"] * len(keys)), keys)
+            guest_ids = dict(cur.fetchall())
+        con.commit()
+        cur.close()
+    return {guest_name: guest_ids[name_key(guest_name)] for guest_name in guest_names}
+
+
+def claimGuestKeys(cur):
+    # guest_key -> guest_id for every guest. Names without a key row yet
+    # (older duplicates, guests added through the API) are claimed for their
+    # highest guest_id, the one the old per-name lookup used to return.
+    cur.execute("SELECT guest_id, guest_name, guest_key FROM guests ORDER BY guest_id")
+    keyed = {}
+    unkeyed = {}
+    for guest_id, guest_name, guest_key in cur.fetchall():
+        if guest_key is not None:
+            keyed[guest_key] = guest_id
+        else:
+            unkeyed[name_key(guest_name)] = guest_id
+    claims = [(key, guest_id) for key, guest_id in unkeyed.items() if key not in keyed]
+    if claims:
+        cur.executemany(CLAIM_GUEST_KEY, claims)
+        metrics.info("claimed %s guest keys" % len(claims))
+    guest_ids = dict(unkeyed)
+    guest_ids.update(keyed)
+    return guest_ids
+
+
+def backfillBlurbs(db_user, db_password, db, blurbs):
+    # Sets the blurb of every (year, guest_name, blurb) whose guest has a
+    # row for that year, in one transaction. Returns the resolved
+    # (year, guest_key) -> guest_id, the unresolved names as
+    # (year, guest_name, reason), and the (year, guest_key) -> guest_id of
+    # rows left alone because an editor changed them. A name listed twice
+    # keeps its first blurb, as the journaled per-guest updates did.
+    staged = {}
+    for year, guest_name, blurb in blurbs:
+        key = name_key(guest_name)
+        staged.setdefault((int(year), key), (int(year), guest_name, key, blurb))
+    if not staged:
+        return {}, [], {}
+
+    resolved = {}
+    unresolved = []
+    moderated = {}
+    with metrics.stage("db"):
+        con = getConnection(db_user, db_password, db)
+        cur = con.cursor()
+        try:
+            claimGuestKeys(cur)
+            cur.execute(DROP_BLURB_STAGING)
+            cur.execute(CREATE_BLURB_STAGING)
+            cur.executemany(INSERT_BLURB_STAGING, list(staged.values()))
+            cur.execute(RESOLVE_BLURBS)
+            for year, key, guest_name, guest_id, has_row, modified in cur.fetchall():
+                if guest_id is None:
+                    unresolved.append((year, guest_name, "no guest_id"))
+                elif not has_row:
+                    unresolved.append((year, guest_name, "no %s row to update" % year))
+                elif modified:
+                    moderated[(year, key)] = guest_id
+                else:
+                    resolved[(year, key)] = guest_id
+            changed = cur.execute(APPLY_BLURBS)
+            cur.execute(DROP_BLURB_STAGING)
+            con.commit()
+        except Exception:
+            con.rollback()
+            raise
+        finally:
+            cur.close()
+    metrics.info("backfilled %s blurbs in one update, %s changed, %s unresolved, %s moderated" % (len(resolved), changed, len(unresolved), len(moderated)))
+    return resolved, sorted(unresolved), moderated
+
+
+class GuestIndex:
+
+    def __init__(self, db_user, db_password, db):
+        self.db_user, self.db_password, self.db = db_user, db_password, db
+        with metrics.stage("db"):
+            con = getConnection(db_user, db_password, db)
+            cur = con.cursor()
+            self.guest_ids = claimGuestKeys(cur)
+            cur.execute("SELECT guest_id, year, modified FROM yearly_guests")
+            rows = cur.fetchall()
+            self.years = {(guest_id, int(year)) for guest_id, year, _ in rows}
+            self.moderated = {(guest_id, int(year)) for guest_id, year, modified in rows if modified}
+            con.commit()
+            cur.close()
+        metrics.info("loaded %s guests and %s yearly rows" % (len(self.guest_ids), len(self.years)))
+
+    def guest_id(self, guest_name):
+        return self.guest_ids.get(name_key(guest_name))
+
+    def add_guests(self, guest_names):
+        new = [guest_name for guest_name in guest_names if name_key(guest_name) not in self.guest_ids]
+        for guest_name, guest_id in allocateGuestIds(self.db_user, self.db_password, self.db, new).items():
+            self.guest_ids[name_key(guest_name)] = guest_id
+
+    def add_guest(self, guest_name):
+        self.add_guests([guest_name])
+        return self.guest_id(guest_name)
+
+    def has_year(self, guest_id, year):
+        return (guest_id, int(year)) in self.years
+
+    def add_year(self, guest_id, year):
+        self.years.add((guest_id, int(year)))
+
+    def is_moderated(self, guest_id, year):
+        return (guest_id, int(year)) in self.moderated
+
+
+def guestIndex(db_user, db_password, db):
+    # Loaded once per process; runs of several specs keep it up to date.
+    global _index
+    if _index is None:
+        _index = GuestIndex(db_user, db_password, db)
+    return _index
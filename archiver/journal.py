@@ -0,0 +1,80 @@
+#!/usr/bin/python3
+
+import json
+import os
+import re
+import threading
+import time
+import metrics
+
+
+# Append-only progress journal for an archiver run. There is one journal per
+# (year, script kind), e.g. journal/2016_scrape_archive_attending.jsonl. A
+# guest is appended once its row has been committed (or was found to exist
+# already), and each line is fsynced so a crash never loses finished work.
+# On restart the scripts consult the journal first and skip those guests
+# without going anywhere near MySQL.
+
+JOURNAL_DIR = os.environ.get("ARCHIVER_JOURNAL_DIR", os.path.join(os.path.dirname(os.path.abspath(__file__)), "journal"))
+
+
+def script_kind(script_path):
+    # 2016_scrape_archive_attending.py -> scrape_archive_attending
+    name = os.path.splitext(os.path.basename(script_path))[0]
+    return re.sub(r"^\d{4}_", "", name)
+
+
+class Journal:
+
+    def __init__(self, year, kind, directory=None):
+        self.year = year
+        self.kind = kind
+        self.path = os.path.join(directory or JOURNAL_DIR, "%s_%s.jsonl" % (year, kind))
+        self.lock = threading.Lock()
+        self.done = set()
+        self._file = None
+        self._load()
+
+    def _key(self, name, year):
+        return (str(self.year if year is None else year), name)
+
+    def _load(self):
+        if not os.path.exists(self.path):
+            return
+
+        with open(self.path, "r", encoding="utf-8") as f:
+            for line in f:
+                try:
+                    entry = json.loads(line)
+                except ValueError:
+                    # A torn final line from a crash mid-write.
+                    continue
+                self.done.add(self._key(entry["name"], entry["year"]))
+
+        if self.done:
+            metrics.info("journal %s: %s guests already done" % (self.path, len(self.done)))
+
+    def is_done(self, name, year=None):
+        return self._key(name, year) in self.done
+
+    def mark_done(self, name, year=None, guest_id=None):
+        key = self._key(name, year)
+        with self.lock:
+            if key in self.done:
+                return
+            if self._file is None:
+                os.makedirs(os.path.dirname(self.path), exist_ok=True)
+                torn = os.path.exists(self.path) and os.path.getsize(self.path) > 0 and not self._ends_with_newline()
+                self._file = open(self.path, "a", encoding="utf-8")
+                if torn:
+                    self._file.write("\n")
+            entry = {"year": key[0], "name": name, "guest_id": guest_id, "at": int(time.time())}
+            self._file.write(json.dumps(entry) + "\n")
+            self._file.flush()
+            os.fsync(self._file.fileno())
+            self.done.add(key)
+
+    def _ends_with_newline(self):
+        with open(self.path, "rb") as f:
+            f.seek(-1, os.SEEK_END)
+            return f.read(1) == b"\n"
@@ -0,0 +1,160 @@
+#!/usr/bin/python3
+
+import argparse
+import json
+import random
+import sys
+import engine
+from markers import cut, from_end, last_line, skip_lines
+from specs import SPECS
+
+
+# Parity check for the offset-based biography cutting in markers.py. The
+# line walk below is the per-line Extractor.biography() that MarkerScanner
+# replaced, kept as the reference. Every distinct bio spec, plus variants
+# with other window, start_offset and slice values, is run over random
+# body texts built from that spec's own markers, so last marker wins,
+# end_before on the first line and marker lines inside the window all come
+# up. last_line, skip_lines, from_end and cut are also checked against
+# their line-list equivalents. Exits non-zero on any difference; run it
+# after touching markers.py or the biography code in engine.py.
+#
+#   python3 marker_fuzz.py [--pages 2000] [--seed 1]
+
+NAME = "Jane Doe"
+WORDS = ["", "text", "Jane Doe", "Jane Doe Jane Doe is  great", "a » b", "x\xa0y", "�", "GUESTS x"]
+
+
+def line_walk(bio, body_text):
+    # (text, guest_type) as the old per-line walk cut it, None for the text
+    # when missing_end is "none", ExtractionError when markers are missing.
+    body_lines = body_text.split("\n")
+
+    if "slice" in bio:
+        first, last = bio["slice"]
+        return ("\n".join(body_lines[first:-last]) if len(body_lines) > last else ""), None
+
+    window = bio.get("window", 1)
+    parse_lines = body_lines[:-window] if len(body_lines) > window else [""]
+    start_line = end_line = guest_type = None
+    for index, value in enumerate(parse_lines):
+        if value in bio["start"]:
+            start_line = index + bio.get("start_offset", 2)
+            guest_type = bio["start"][value]
+        if value in bio.get("end", ()) or any(marker in value for marker in bio.get("end_contains", ())):
+            end_line = index
+            if value == bio.get("end_before"):
+                end_line = index - 1
+
+    if end_line is None and bio.get("missing_end") == "none":
+        return None, None
+    if start_line is None and bio.get("missing_start") == "top":
+        start_line = 0
+    if start_line is None or end_line is None:
+        raise engine.ExtractionError("biography markers not found")
+    return ("\n".join(body_lines[start_line:end_line]) if len(body_lines) > end_line else ""), guest_type
+
+
+def bio_variants(rng):
+    # Each distinct bio spec, and a few variants of it.
+    seen = {}
+    for spec in SPECS:
+        bio = spec.get("bio")
+        if bio and "template" not in bio:
+            seen.setdefault(json.dumps(bio, sort_keys=True), (spec, bio))
+    for spec, bio in seen.values():
+        yield spec, bio
+        for _ in range(3):
+            if "slice" in bio:
+                yield spec, dict(bio, slice=(rng.randint(0, 6), rng.randint(1, 6)))
+            else:
+                yield spec, dict(bio, window=rng.randint(1, 4), start_offset=rng.randint(0, 3))
+
+
+def marker_lines(bio):
+    lines = list(bio.get("start", ())) + list(bio.get("end", ()))
+    for marker in bio.get("end_contains", ()):
+        lines += [marker, "before %s after" % marker]
+    if bio.get("end_before"):
+        lines.append(bio["end_before"])
+    return lines
+
+
+def random_text(rng, lines):
+    choices = lines + WORDS
+    return "\n".join(rng.choice(choices) for _ in range(rng.randint(0, 25)))
+
+
+def outcome(cut_biography, text):
+    try:
+        return cut_biography(text)
+    except engine.ExtractionError:
+        return "ExtractionError"
+
+
+def old_biography(extractor, bio, text):
+    biography, guest_type = line_walk(bio, text)
+    if biography is not None:
+        biography = extractor._clean_biography(biography, NAME)
+    return biography, guest_type
+
+
+def check_helpers(rng, pages):
+    # The offset helpers against the same arithmetic on a list of lines.
+    mismatches = 0
+    for _ in range(pages):
+        lines = [rng.choice(["a", "ab", "b", "", "a b"]) for _ in range(rng.randint(1, 12))]
+        text = "\n".join(lines)
+        starts = [sum(len(line) + 1 for line in lines[:index]) for index in range(len(lines))]
+        count = rng.randint(0, len(lines) + 1)
+        # window and the slice end are never 0.
+        from_last = rng.randint(1, len(lines) + 1)
+        line = rng.choice(["a", "ab", "b", ""])
+        index = rng.randrange(len(lines) + 1)
+        limit = starts[index] - 1 if index < len(lines) else len(text)
+        matches = [starts[i] for i in range(index) if lines[i] == line]
+        first = rng.randrange(len(lines))
+        last = rng.randrange(len(lines) + 1)
+        checks = [
+            ("last_line", last_line(text, line, limit) if limit >= 0 else None, matches[-1] if matches else None),
+            ("skip_lines", skip_lines(text, starts[first], count), starts[first + count] if first + count < len(lines) else None),
+            ("from_end", from_end(text, from_last), starts[len(lines) - from_last] if from_last < len(lines) else None),
+            ("cut", cut(text, starts[first], starts[last] if last < len(lines) else None), "\n".join(lines[first:last]) if last < len(lines) else ""),
+        ]
+        for helper, got, expected in checks:
+            if got != expected:
+                mismatches += 1
+                if mismatches <= 3:
+                    print("%s differs on %r\n  lines: %r\n  markers.py: %r" % (helper, text, expected, got))
+    return mismatches
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Check the offset-based biography cutting against the old line walk.")
+    parser.add_argument("--pages", type=int, default=2000, help="random texts per bio spec")
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args(argv)
+
+    rng = random.Random(args.seed)
+    checked = mismatches = 0
+    for spec, bio in bio_variants(rng):
+        extractor = engine.Extractor(dict(spec, bio=bio))
+        lines = marker_lines(bio)
+        for _ in range(args.pages):
+            text = random_text(rng, lines)
+            expected = outcome(lambda text: old_biography(extractor, bio, text), text)
+            got = outcome(lambda text: extractor.text_biography(text, NAME), text)
+            checked += 1
+            if got != expected:
+                mismatches += 1
+                if mismatches <= 3:
+                    print("%s %s %s differs on %r\n  line walk: %r\n  markers:   %r" % (spec["year"], spec["kind"], bio, text, expected, got))
+
+    helper_mismatches = check_helpers(rng, args.pages * 10)
+    print("biographies: %s of %s texts differ" % (mismatches, checked))
+    print("helpers: %s of %s checks differ" % (helper_mismatches, args.pages * 40))
+    return 1 if mismatches or helper_mismatches else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
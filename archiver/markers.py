@@ -0,0 +1,93 @@
+#!/usr/bin/python3
+
+
+# Finds the lines that bracket a biography in a page's body text and
+# returns character offsets into it instead of line lists. The last marker
+# line on a page is the one that counts, so each marker is searched for
+# backwards from the end with str.rfind(), which stops at its last
+# occurrence. Offsets always point at the start of a line; cut() turns two
+# of them into the text between, the way "\n".join(lines[first:last]) would.
+
+
+class MarkerScanner:
+
+    def __init__(self, start=(), end=(), end_contains=(), end_before=None):
+        self.start = dict(start)
+        self.end = tuple(set(end))
+        self.end_contains = tuple(end_contains)
+        self.end_before = end_before
+
+    def scan(self, text, limit):
+        # Offsets of the last start marker line and the last end line in
+        # text[:limit], and the start marker's value; None where not found.
+        # An end_before line ends the biography a line earlier.
+        start = value = end = None
+        for marker, marker_value in self.start.items():
+            line = last_line(text, marker, limit)
+            if line is not None and (start is None or line > start):
+                start, value = line, marker_value
+
+        found = [last_line(text, marker, limit) for marker in self.end]
+        for marker in self.end_contains:
+            position = text.rfind(marker, 0, limit)
+            if position != -1:
+                found.append(text.rfind("\n", 0, position) + 1)
+        found = [line for line in found if line is not None]
+        if found:
+            end = max(found)
+            if self.end_before is not None and line_at(text, end) == self.end_before:
+                end = previous_line(text, end)
+        return start, value, end
+
+
+def last_line(text, line, limit):
+    # Offset of the last line in text[:limit] that is exactly line.
+    size = len(line)
+    position = text.rfind(line, 0, limit)
+    while position != -1:
+        if (position == 0 or text[position - 1] == "\n") and (position + size == limit or text[position + size] == "\n"):
+            return position
+        if position + size == 0:
+            break
+        position = text.rfind(line, 0, position + size - 1)
+    return None
+
+
+def line_at(text, offset):
+    newline = text.find("\n", offset)
+    return text[offset:] if newline == -1 else text[offset:newline]
+
+
+def previous_line(text, offset):
+    # Before the first line comes the last one, as with lines[-1].
+    if offset == 0:
+        return text.rfind("\n") + 1
+    return text.rfind("\n", 0, offset - 1) + 1
+
+
+def skip_lines(text, offset, count):
+    # Offset of the line count lines further down, None past the last line.
+    for _ in range(count):
+        newline = text.find("\n", offset)
+        if newline == -1:
+            return None
+        offset = newline + 1
+    return offset
+
+
+def from_end(text, count):
+    # Offset of the count-th line from the end, None if there are no more
+    # lines than that.
+    offset = len(text)
+    for _ in range(count):
+        offset = text.rfind("\n", 0, offset)
+        if offset == -1:
+            return None
+    return offset + 1
+
+
+def cut(text, first, last):
+    # The lines from offset first up to, not including, the line at last.
+    if first is None or last is None or first >= last:
+        return ""
+    return text[first:last - 1]
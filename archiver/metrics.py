@@ -0,0 +1,168 @@
+#!/usr/bin/python3
+
+import argparse
+import json
+import os
+import sys
+import threading
+import time
+from collections import Counter, defaultdict
+from contextlib import contextmanager
+
+
+# Run instrumentation: leveled log lines, per-stage timers and counters.
+#
+# Stage timers are exclusive, so a stage nested in another (normalize inside
+# parse) is not counted twice, and they add up across threads, so fetch time
+# from the wayback pool can exceed the wall time. Parse workers time their
+# own stages and hand them back with the result. At the end of a run,
+# report() prints a one-line summary and appends the run as one JSON line to
+# stats/runs.jsonl (or ARCHIVER_STATS_DIR), which
+#
+#   python3 metrics.py [--last 20]
+#
+# turns into a table of throughput per year and kind.
+#
+# ARCHIVER_LOG_LEVEL=debug brings back the per-guest lines (guest ids, the
+# encoded bio and blurb, executed queries); warning leaves only problems.
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+STATS_DIR = os.environ.get("ARCHIVER_STATS_DIR", os.path.join(HERE, "stats"))
+
+LEVELS = {"debug": 10, "info": 20, "warning": 30, "error": 40}
+LOG_LEVEL = LEVELS.get(os.environ.get("ARCHIVER_LOG_LEVEL", "info").lower(), LEVELS["info"])
+
+STAGES = ("listing", "fetch", "parse", "normalize", "wait", "db")
+
+
+def log(level, message):
+    if LEVELS[level] >= LOG_LEVEL:
+        print(message)
+
+
+def debug(message):
+    log("debug", message)
+
+
+def info(message):
+    log("info", message)
+
+
+def warning(message):
+    log("warning", message)
+
+
+class RunStats:
+
+    def __init__(self, year=None, kind=None):
+        self.year = year
+        self.kind = kind
+        self.started = time.time()
+        self.timers = defaultdict(float)
+        self.counters = Counter()
+        self.lock = threading.Lock()
+        self._local = threading.local()
+
+    @contextmanager
+    def stage(self, name):
+        stack = self._local.__dict__.setdefault("stack", [])
+        stack.append(0.0)
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - start
+            nested = stack.pop()
+            if stack:
+                stack[-1] += elapsed
+            self.add_time(name, elapsed - nested)
+
+    def add_time(self, name, seconds):
+        with self.lock:
+            self.timers[name] += seconds
+
+    def count(self, name, amount=1):
+        with self.lock:
+            self.counters[name] += amount
+
+    def merge(self, timers=None, counters=None):
+        with self.lock:
+            for name, seconds in (timers or {}).items():
+                self.timers[name] += seconds
+            self.counters.update(counters or {})
+
+    def export(self):
+        with self.lock:
+            return dict(self.timers), dict(self.counters)
+
+    def summary(self):
+        wall = time.time() - self.started
+        timers, counters = self.export()
+        pages = counters.get("pages", 0)
+        return {
+            "year": self.year,
+            "kind": self.kind,
+            "started": int(self.started),
+            "wall": round(wall, 3),
+            "stages": {name: round(seconds, 3) for name, seconds in sorted(timers.items())},
+            "counters": dict(sorted(counters.items())),
+            "pages_per_second": round(pages / wall, 2) if wall else 0,
+        }
+
+    def report(self):
+        summary = self.summary()
+        stages = " ".join("%s %.1fs" % (name, seconds) for name, seconds in summary["stages"].items())
+        counters = " ".join("%s %s" % (name, count) for name, count in summary["counters"].items())
+        info("%s %s: %.1fs wall, %.2f pages/s | %s | %s" % (self.year, self.kind, summary["wall"], summary["pages_per_second"], stages, counters))
+        os.makedirs(STATS_DIR, exist_ok=True)
+        with open(os.path.join(STATS_DIR, "runs.jsonl"), "a", encoding="utf-8") as f:
+            f.write(json.dumps(summary) + "\n")
+        return summary
+
+
+_current = RunStats()
+
+
+def current():
+    return _current
+
+
+def begin(year=None, kind=None):
+    # Makes a fresh RunStats the one every module records into.
+    global _current
+    _current = RunStats(year, kind)
+    return _current
+
+
+def stage(name):
+    return _current.stage(name)
+
+
+def count(name, amount=1):
+    _current.count(name, amount)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Throughput per year and kind from recorded runs.")
+    parser.add_argument("--last", type=int, default=0, help="only the last N runs")
+    args = parser.parse_args(argv)
+
+    path = os.path.join(STATS_DIR, "runs.jsonl")
+    if not os.path.exists(path):
+        print("no runs recorded in %s" % path)
+        return 1
+    with open(path, encoding="utf-8") as f:
+        runs = [json.loads(line) for line in f if line.strip()]
+    if args.last:
+        runs = runs[-args.last:]
+
+    print("%-19s %-4s %-30s %8s %6s %8s  %s" % ("started", "year", "kind", "wall", "pages", "pages/s", " ".join("%8s" % name for name in STAGES)))
+    for run in runs:
+        started = time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(run["started"]))
+        stages = " ".join("%8.1f" % run["stages"].get(name, 0) for name in STAGES)
+        print("%-19s %-4s %-30s %8.1f %6s %8.2f  %s" % (started, run["year"], run["kind"], run["wall"], run["counters"].get("pages", 0), run["pages_per_second"], stages))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
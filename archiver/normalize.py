@@ -0,0 +1,134 @@
+#!/usr/bin/python3
+
+import re
+
+
+# Text cleanup for guest names, blurbs and biographies. The specs describe
+# cleanup as ordered steps (see specs.py); compile_steps() turns them into
+# one function per spec, dropping steps that cannot change the text where
+# they sit and doing the whitespace collapse without the regex engine. The
+# result is the same string the steps give when run one by one, which
+# normalize_benchmark.py checks over the bio corpus.
+
+NBSP = "\xa0"
+# What bytes the pages were mis-decoded from turn into.
+REPLACEMENT_CHAR = "\ufffd"
+# Formatting tags that survive as text in some of the blurbs.
+TAG_RESIDUE = ("<i>", "</i>")
+# Backslash sequences some of the later pages carry as literal text.
+LITERAL_ESCAPES = (r"\xa0", r"\u00a0")
+
+COLLAPSE_PATTERN = r"\s+"
+
+# What may follow a name dropped from the front of a blurb.
+NAME_SEPARATOR = re.compile(r"\b[:,]?\s*")
+
+_leading_names = {}
+
+
+def collapse(text):
+    """Same as re.sub(r"\\s+", " ", text): str.split() and re's \\s agree on what whitespace is."""
+    words = text.split()
+    if not words:
+        return " " if text else ""
+    collapsed = " ".join(words)
+    if text[0].isspace():
+        collapsed = " " + collapsed
+    if text[-1].isspace():
+        collapsed += " "
+    return collapsed
+
+
+def drop_leading_name(text, name):
+    """Same as re.sub(rf"^{re.escape(name)}\\b[:,]?\\s*", "", text, flags=re.I)."""
+    size = len(name)
+    head = text[:size]
+    if head.isascii() and name.isascii():
+        # Plain ASCII folds the same way in str.lower() and re.IGNORECASE.
+        if head.lower() != name.lower():
+            return text
+        match = NAME_SEPARATOR.match(text, size)
+        return text[match.end():] if match else text
+    pattern = _leading_names.get(name)
+    if pattern is None:
+        pattern = _leading_names[name] = re.compile(rf"^{re.escape(name)}\b[:,]?\s*", re.IGNORECASE)
+    return pattern.sub("", text, count=1)
+
+
+def squash_biography(text, name, drop_replacement_char=False):
+    text = text.replace("  \t", " ").replace(NBSP, " ").replace("  ", " ")
+    if drop_replacement_char:
+        text = text.replace(REPLACEMENT_CHAR, "")
+    # Pages that repeat the name as a heading and as the first words.
+    return text.replace(name + " " + name, name).strip()
+
+
+def _drop_name(where):
+    if where == "once":
+        return lambda text, name: text.replace(name, "", 1)
+    if where == "prefix":
+        # Only look for the name in the first 50 characters.
+        return lambda text, name: text[:50].replace(name, "", 1) + text[50:]
+    if where == "leading":
+        return drop_leading_name
+    raise ValueError("unknown drop_name position %r" % (where,))
+
+
+def _is_collapse(step):
+    return step[0] == "sub" and step[1] == COLLAPSE_PATTERN and step[2] == " " and not (len(step) > 3 and step[3])
+
+
+def _is_blank(text):
+    return text != "" and text.isspace()
+
+
+def _simplify(steps):
+    kept = []
+    for step in steps:
+        if _is_collapse(step):
+            # Whitespace turned into spaces right before a collapse ends up
+            # as the same single space either way.
+            while kept and kept[-1][0] == "replace" and _is_blank(kept[-1][1]) and _is_blank(kept[-1][2]):
+                kept.pop()
+            kept.append(step)
+            continue
+        if step[0] == "replace" and kept and _is_collapse(kept[-1]) and _is_blank(step[1]) and step[1] != " ":
+            # Nothing but single spaces is left after a collapse.
+            continue
+        kept.append(step)
+    return kept
+
+
+def _compile_step(step):
+    op = step[0]
+    if op == "replace":
+        old, new = step[1], step[2]
+        return lambda text, name: text.replace(old, new)
+    if op == "sub":
+        if _is_collapse(step):
+            return lambda text, name: collapse(text)
+        pattern = re.compile(step[1], step[3] if len(step) > 3 else 0)
+        repl = step[2]
+        return lambda text, name: pattern.sub(repl, text)
+    if op == "strip":
+        return lambda text, name: text.strip()
+    if op == "lstrip":
+        return lambda text, name: text.lstrip()
+    if op == "drop_name":
+        return _drop_name(step[1])
+    if op == "empty_none":
+        return lambda text, name: text if len(text) > 0 else None
+    raise ValueError("unknown cleanup step %r" % (op,))
+
+
+def compile_steps(steps):
+    funcs = [_compile_step(step) for step in _simplify(list(steps or ()))]
+
+    def clean(text, name=None):
+        for func in funcs:
+            if text is None:
+                break
+            text = func(text, name)
+        return text
+
+    return clean
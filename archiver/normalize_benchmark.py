@@ -0,0 +1,120 @@
+#!/usr/bin/python3
+
+import re
+import sys
+import time
+import normalize
+import parsers
+import parser_benchmark
+from specs import SPECS
+
+
+# Times the cleanup in normalize.py against running the same spec steps one
+# by one, over the body text of every page in the snapshot cache (or the
+# files given on the command line). Every line of every page goes through
+# each distinct blurb/name pipeline in specs.py, and every page through the
+# biography squash. Exits non-zero if the compiled cleanup returns anything
+# the plain steps do not.
+#
+#   python3 normalize_benchmark.py [file ...]
+
+
+def step_by_step(steps):
+    def clean(text, name=None):
+        for step in steps:
+            if text is None:
+                break
+            op = step[0]
+            if op == "replace":
+                text = text.replace(step[1], step[2])
+            elif op == "sub":
+                text = re.sub(step[1], step[2], text, flags=step[3] if len(step) > 3 else 0)
+            elif op == "strip":
+                text = text.strip()
+            elif op == "lstrip":
+                text = text.lstrip()
+            elif op == "empty_none":
+                text = text if len(text) > 0 else None
+            elif step[1] == "once":
+                text = text.replace(name, "", 1)
+            elif step[1] == "prefix":
+                text = text[:50].replace(name, "", 1) + text[50:]
+            else:
+                text = re.sub(rf"^{re.escape(name)}\b[:,]?\s*", "", text, flags=re.IGNORECASE)
+        return text
+
+    return clean
+
+
+def squash_step_by_step(text, name, drop_replacement_char):
+    biography = text.replace("  \t", " ")
+    biography = biography.replace("\xa0", " ")
+    biography = biography.replace("  ", " ")
+    if drop_replacement_char:
+        biography = biography.replace("�", "")
+    combined_name = (name + " " + name)
+    return biography.replace(combined_name, name).strip()
+
+
+def spec_pipelines():
+    pipelines = {}
+    for spec in SPECS:
+        listing = spec["listing"]
+        found = [listing.get("name_clean"), listing.get("description", {}).get("clean"), listing.get("subs")]
+        found += [tag[3] for tag in listing.get("tags", ()) if len(tag) > 3]
+        for steps in found:
+            if steps:
+                pipelines[repr(steps)] = list(steps)
+    return list(pipelines.values())
+
+
+def run_all(lines, pages, pipelines, cleaners, squash):
+    results = []
+    for clean in cleaners:
+        results.append([clean(line, name) for line, name in lines])
+    for flag in (False, True):
+        results.append([squash(text, name, flag) for text, name in pages])
+    return results
+
+
+def timed(label, size, work):
+    start = time.perf_counter()
+    results = work()
+    elapsed = time.perf_counter() - start
+    print("%-14s %8.2f s  %7.2f MB/s" % (label, elapsed, size / elapsed / 1e6))
+    return results
+
+
+def main(files):
+    pages = []
+    lines = []
+    for filename in files:
+        with open(filename, "rb") as f:
+            text = parsers.page_text(parsers.make_page(parsers.decode_markup(f.read()), "html.parser"))
+        # Stand in for the guest name with the first two words of the text.
+        pages.append((text.replace("\n", " "), " ".join(text.split()[:2])))
+        lines += [(line, " ".join(line.split()[:2])) for line in text.split("\n")]
+    if not pages:
+        print("no pages to clean, fill the snapshot cache first or pass files")
+        return 1
+
+    pipelines = spec_pipelines()
+    size = (sum(len(line.encode("utf-8")) for line, _ in lines) * len(pipelines)
+            + sum(len(text.encode("utf-8")) for text, _ in pages) * 2)
+    print("%s pages, %s lines, %s pipelines, %.1f MB" % (len(pages), len(lines), len(pipelines), size / 1e6))
+
+    expected = timed("step by step", size, lambda: run_all(lines, pages, pipelines, [step_by_step(steps) for steps in pipelines], squash_step_by_step))
+    got = timed("normalize", size, lambda: run_all(lines, pages, pipelines, [normalize.compile_steps(steps) for steps in pipelines], normalize.squash_biography))
+
+    mismatches = 0
+    for steps, want, have in zip(pipelines + ["squash", "squash drop_replacement_char"], expected, got):
+        differing = sum(1 for a, b in zip(want, have) if a != b)
+        if differing:
+            mismatches += differing
+            print("%s: %s texts differ" % (steps, differing))
+    print("%s mismatches" % mismatches)
+    return 1 if mismatches else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:] or parser_benchmark.cached_pages()))
@@ -0,0 +1,85 @@
+#!/usr/bin/python3
+
+import glob
+import os
+import sys
+import time
+import parsers
+import snapshot_cache
+
+
+# Times every installed parser backend over the pages in the snapshot cache
+# (or the files given on the command line) and checks that each one yields
+# the same things the extraction specs pull out of a page: the body text lines
+# the biographies come from, and, per tree builder, the (text, href) pairs of
+# every link and the text of every li, p and h1-h3 that names and blurbs are
+# read from. Exits non-zero on any mismatch with html.parser, so a backend
+# switch can be checked against a cache before a real run.
+#
+#   python3 parser_benchmark.py [file ...]
+
+
+def tree_fields(soup):
+    return {
+        "links": [(a.get_text(strip=True), a.get("href")) for a in soup.find_all("a")],
+        "blocks": [tag.get_text(" ", strip=True) for tag in soup.find_all(["li", "p", "h1", "h2", "h3"])],
+    }
+
+
+def cached_pages():
+    return sorted(glob.glob(os.path.join(snapshot_cache.CACHE_DIR, "objects", "*", "*")))
+
+
+def timed(label, count, size, work):
+    start = time.perf_counter()
+    results = work()
+    elapsed = time.perf_counter() - start
+    print("%-24s %5s pages  %8.2f s  %7.1f pages/s  %6.2f MB/s" % (label, count, elapsed, count / elapsed, size / elapsed / 1e6))
+    return results
+
+
+def compare(kind, name, pages, expected, got):
+    mismatches = 0
+    for (filename, _), want, have in zip(pages, expected, got):
+        for field in want:
+            if want[field] != have[field]:
+                mismatches += 1
+                print("%s: %s %s differs from html.parser in %s" % (filename, kind, name, field))
+    return mismatches
+
+
+def main(files):
+    pages = []
+    for filename in files:
+        with open(filename, "rb") as f:
+            pages.append((filename, parsers.decode_markup(f.read())))
+    if not pages:
+        print("no pages to parse, fill the snapshot cache first or pass files")
+        return 1
+
+    count = len(pages)
+    size = sum(len(markup.encode("utf-8")) for _, markup in pages)
+    mismatches = 0
+
+    trees = {}
+    fields = {}
+    for builder in parsers.available_tree_builders():
+        trees[builder] = timed("tree %s" % builder, count, size, lambda: [parsers.make_soup(markup, builder) for _, markup in pages])
+        fields[builder] = [tree_fields(soup) for soup in trees[builder]]
+    for builder in fields:
+        mismatches += compare("tree builder", builder, pages, fields["html.parser"], fields[builder])
+
+    # Biography pages: markup in, body text out, as scrape_archived_page()
+    # and the engine's biography parsing do it.
+    texts = {}
+    for backend in parsers.available_backends():
+        texts[backend] = timed("text %s" % backend, count, size, lambda: [{"text": parsers.page_text(parsers.make_page(markup, "html.parser"), backend)} for _, markup in pages])
+    for backend in texts:
+        mismatches += compare("text backend", backend, pages, texts["html.parser"], texts[backend])
+
+    print("%s mismatches" % mismatches)
+    return 1 if mismatches else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:] or cached_pages()))
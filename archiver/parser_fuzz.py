@@ -0,0 +1,97 @@
+#!/usr/bin/python3
+
+import argparse
+import random
+import sys
+import parsers
+
+
+# Parity check for the default text backend. The stream backend hooks into
+# bs4's html.parser handler (bs4.builder._htmlparser, not public API), so a
+# bs4 upgrade can quietly change what it extracts. This feeds it a fixed set
+# of awkward pages plus random markup with unbalanced tags, entities, CDATA,
+# comments and Wayback toolbar ids, and checks its text against
+# soup.body.get_text() on the html.parser tree. Exits non-zero on any
+# difference; run it before moving the bs4 pin in requirements.txt.
+#
+#   python3 parser_fuzz.py [--pages 4000] [--seed 1] [--backends stream,lxml]
+#
+# lxml and selectolax can be checked too, but they repair broken markup
+# differently and are expected to differ (see parsers.py).
+
+SKIP_IDS = ("wm-ipp", "donato")
+
+CASES = [
+    "<html><head><title>t</title><script>var x=1</script></head><body><p>a &amp; b&#150;c &foo; d</p><!-- c --><script>no</script><style>x{}</style>tail<br>x<br/>y</body>after<p>z</p></html>",
+    "no body at all <p>x</p>",
+    "<body><template><p>hidden</p></template><ruby>漢<rt>kan</rt><rp>(</rp></ruby><![CDATA[cdata]]><div id='wm-ipp'>toolbar <b>x</b></div>keep</body>",
+    "<html><body><div><p>one<p>two</div></body><body>second body</body></html>",
+    "<body><b>x</html>y</b>z</body>",
+    "<body>\xa0 nbsp \xa0<pre>  pre  </pre><textarea> t </textarea></body>",
+    "<body><p>a</p></p></br>b<img src=x>c</img>d</body>",
+    "<html><body>x<table><tr><td>1<td>2</table></body></html><!doctype html>",
+    "<body><table><tr><td>a</td></tr>stray</table><noframes>nf</noframes></body>",
+]
+
+TAGS = ["p", "b", "div", "li", "ul", "body", "html", "head", "script", "style", "br", "img", "template", "span", "a", "rt", "pre", "table", "tr", "td", "textarea", "noframes"]
+
+
+def random_page(rng):
+    out = []
+    for _ in range(rng.randint(5, 40)):
+        roll = rng.random()
+        tag = rng.choice(TAGS)
+        if roll < 0.35:
+            out.append("<%s%s>" % (tag, rng.choice(["", " id='wm-ipp'", " class=x", " id=donato"])))
+        elif roll < 0.6:
+            out.append("</%s>" % tag)
+        elif roll < 0.65:
+            out.append("<!-- c%d -->" % rng.randint(0, 9))
+        elif roll < 0.7:
+            out.append(rng.choice(["&amp;", "&#150;", "&nbsp;", "&bogus;", "&#x41;", "<![CDATA[cd]]>", "<br/>"]))
+        else:
+            out.append(rng.choice(["word", " two words ", "\n", "  ", "x\ny"]))
+    return "".join(out)
+
+
+def drop_toolbar(soup):
+    for toolbar_id in SKIP_IDS:
+        for tag in soup.find_all(id=toolbar_id):
+            tag.decompose()
+    return soup
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Check text backends against get_text() on random malformed markup.")
+    parser.add_argument("--pages", type=int, default=4000)
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--backends", default="stream", help="comma-separated, e.g. stream,lxml")
+    args = parser.parse_args(argv)
+
+    backends = [backend for backend in args.backends.split(",") if backend]
+    for backend in backends:
+        if backend not in parsers.available_backends():
+            parser.error("backend %s is not installed" % backend)
+    rng = random.Random(args.seed)
+    pages = CASES + [random_page(rng) for _ in range(args.pages)]
+
+    mismatches = dict.fromkeys(backends, 0)
+    for markup in pages:
+        expected = parsers.page_text(parsers.make_page(markup, "html.parser", prepare=drop_toolbar), "html.parser")
+        for backend in backends:
+            # As in wayback.page_from_content: pages with toolbar ids left
+            # in them go to the stream backend whatever is chosen.
+            text_ok = not any(toolbar_id in markup for toolbar_id in SKIP_IDS)
+            got = parsers.page_text(parsers.make_page(markup, "html.parser", text_ok=text_ok, skip_ids=SKIP_IDS), backend)
+            if got != expected:
+                mismatches[backend] += 1
+                if mismatches[backend] <= 3:
+                    print("%s differs on %r\n  get_text: %r\n  %s: %r" % (backend, markup, expected, backend, got))
+
+    for backend, count in mismatches.items():
+        print("%s: %s of %s pages differ" % (backend, count, len(pages)))
+    return 1 if any(mismatches.values()) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
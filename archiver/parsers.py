@@ -0,0 +1,274 @@
+#!/usr/bin/python3
+
+import os
+import re
+from bs4 import BeautifulSoup, CData, UnicodeDammit
+from bs4.builder import HTMLParserTreeBuilder, ParserRejectedMarkup
+from bs4.builder._htmlparser import BeautifulSoupHTMLParser
+import metrics
+
+
+# HTML parser backends for the archiver. Biography parsing in engine.py only
+# needs the full-body text dump, so pages come back as an ArchivedPage whose
+# soup is built lazily, and page_text() produces the text without building
+# the tree. The soup the scripts query is still built with html.parser
+# unless ARCHIVER_TREE_BUILDER=lxml: lxml nests unclosed <li>/<p>
+# differently, which matters on the old list pages, so only switch once
+# parser_benchmark.py is clean for the cache.
+#
+# ARCHIVER_PARSER picks the text backend: stream (the default), html.parser,
+# lxml or selectolax. "stream" needs nothing beyond bs4: it runs bs4's own
+# html.parser event handler but only keeps the body strings, so no tree is
+# built at all, its text is the same as bs4's get_text(), and it can leave
+# out whole subtrees (the Wayback toolbar) by id while it goes. lxml and
+# selectolax are faster but opt-in: they repair malformed markup the HTML5
+# way, so on broken pages their text differs from get_text() (stray table
+# text moved ahead of the table, text after </body> or in <head> kept, a
+# second <body> merged in, <noframes> text dropped, <textarea> content left
+# as markup).
+
+SKIP_TEXT_TAGS = ("script", "style", "template")
+
+# selectolax and lxml make up a <body> when the markup has none; soup.body
+# would be None there.
+BODY_TAG = re.compile(r"<body[\s/>]", re.I)
+
+
+def installed(module):
+    # Whether an optional dependency can be imported.
+    try:
+        __import__(module)
+        return True
+    except ImportError:
+        return False
+
+
+HAVE_LXML = installed("lxml")
+HAVE_SELECTOLAX = installed("selectolax.lexbor")
+
+
+def available_backends():
+    backends = ["stream", "html.parser"]
+    if HAVE_LXML:
+        backends.append("lxml")
+    if HAVE_SELECTOLAX:
+        backends.append("selectolax")
+    return backends
+
+
+def available_tree_builders():
+    return ["lxml", "html.parser"] if HAVE_LXML else ["html.parser"]
+
+
+BACKEND = os.environ.get("ARCHIVER_PARSER") or "stream"
+if BACKEND not in available_backends():
+    metrics.warning("parser backend %s is not installed, falling back to stream" % BACKEND)
+    BACKEND = "stream"
+
+TREE_BUILDER = os.environ.get("ARCHIVER_TREE_BUILDER", "html.parser")
+if TREE_BUILDER not in available_tree_builders():
+    metrics.warning("tree builder %s is not installed, falling back to html.parser" % TREE_BUILDER)
+    TREE_BUILDER = "html.parser"
+
+
+class ArchivedPage:
+    # Markup plus the BeautifulSoup tree the scripts query. The tree is only
+    # built the first time something other than page_text() touches the page,
+    # so biography pages that just need their text never pay for it.
+
+    def __init__(self, markup, builder=None, prepare=None, text_ok=True, skip_ids=()):
+        self.raw_markup = decode_markup(markup)
+        self.builder = builder or TREE_BUILDER
+        self.prepare = prepare
+        # False when the markup has something in it the soup will drop.
+        self.text_ok = text_ok
+        # Elements prepare() removes from the soup, by id. The stream backend
+        # leaves them out itself, so it can still be used when text_ok is False.
+        self.skip_ids = frozenset(skip_ids)
+        self._soup = None
+
+    @property
+    def soup(self):
+        if self._soup is None:
+            self._soup = BeautifulSoup(self.raw_markup, self.builder)
+            if self.prepare is not None:
+                self._soup = self.prepare(self._soup)
+        return self._soup
+
+    def __getattr__(self, name):
+        return getattr(self.soup, name)
+
+    def __call__(self, *args, **kwargs):
+        return self.soup(*args, **kwargs)
+
+
+def decode_markup(markup):
+    # Decode once up front so every backend sees exactly the same text.
+    if isinstance(markup, str):
+        return markup
+    if hasattr(markup, "read"):
+        markup = markup.read()
+        if isinstance(markup, str):
+            return markup
+    return UnicodeDammit(markup, is_html=True).unicode_markup or ""
+
+
+def make_soup(markup, builder=None):
+    return BeautifulSoup(decode_markup(markup), builder or TREE_BUILDER)
+
+
+def make_page(markup, builder=None, prepare=None, text_ok=True, skip_ids=()):
+    return ArchivedPage(markup, builder, prepare, text_ok, skip_ids)
+
+
+def _soup_text(soup):
+    body = soup.body
+    return body.get_text(separator="\n", strip=True) if body else ""
+
+
+def _lxml_text(markup):
+    import lxml.html
+
+    if not markup.strip():
+        return ""
+    root = lxml.html.document_fromstring(markup)
+    body = root.find("body")
+    if body is None:
+        return ""
+
+    pieces = []
+
+    def walk(element):
+        if element.text and element.tag not in SKIP_TEXT_TAGS:
+            pieces.append(element.text)
+        for child in element:
+            if isinstance(child.tag, str):
+                walk(child)
+            if child.tail:
+                pieces.append(child.tail)
+
+    walk(body)
+    return "\n".join(piece.strip() for piece in pieces if piece.strip())
+
+
+class _OpenTag:
+    __slots__ = ("name", "is_empty_element", "body", "skip", "container")
+
+    def __init__(self, name, is_empty_element, body, skip, container):
+        self.name = name
+        self.is_empty_element = is_empty_element
+        self.body = body
+        self.skip = skip
+        self.container = container
+
+
+class _BodyTextSink:
+    # Stands in for the BeautifulSoup object that bs4's html.parser builder
+    # feeds. It keeps the open-tag stack the way BeautifulSoup does (pop to
+    # the most recent tag of that name, ignore stray end tags) and collects
+    # the strings that soup.body.get_text() would return, nothing else.
+
+    def __init__(self, skip_ids=()):
+        self.builder = HTMLParserTreeBuilder(store_line_numbers=False)
+        self.skip_ids = skip_ids
+        self.stack = []
+        self.open_names = {}
+        self.current = []
+        self.pieces = []
+        self.body_seen = False
+        self.in_body = False
+        self.skipping = 0
+        self.containers = 0
+
+    def handle_starttag(self, name, namespace, nsprefix, attrs, sourceline=None, sourcepos=None, namespaces=None):
+        self.endData()
+        skip = bool(self.skip_ids) and attrs.get("id") in self.skip_ids
+        # soup.body is the first <body> that survives the skipped subtrees.
+        body = name == "body" and not self.body_seen and not self.skipping and not skip
+        tag = _OpenTag(name, self.builder.can_be_empty_element(name), body, skip, name in self.builder.string_containers)
+        if body:
+            self.body_seen = self.in_body = True
+        self.skipping += tag.skip
+        self.containers += tag.container
+        self.stack.append(tag)
+        self.open_names[name] = self.open_names.get(name, 0) + 1
+        return tag
+
+    def handle_endtag(self, name, nsprefix=None):
+        self.endData()
+        while self.open_names.get(name):
+            tag = self.stack.pop()
+            self.open_names[tag.name] -= 1
+            self.skipping -= tag.skip
+            self.containers -= tag.container
+            if tag.body:
+                self.in_body = False
+            if tag.name == name:
+                break
+
+    def handle_data(self, data):
+        self.current.append(data)
+
+    def endData(self, containerClass=None):
+        if not self.current:
+            return
+        text = "".join(self.current)
+        self.current = []
+        if not self.in_body or self.skipping:
+            return
+        # Comments, doctypes and the like never count; script, style and
+        # template strings don't either, which body.get_text() skips too.
+        if containerClass is None:
+            if self.containers:
+                return
+        elif containerClass is not CData:
+            return
+        text = text.strip()
+        if text:
+            self.pieces.append(text)
+
+
+def _stream_text(markup, skip_ids=()):
+    sink = _BodyTextSink(skip_ids)
+    args, kwargs = sink.builder.parser_args
+    parser = BeautifulSoupHTMLParser(sink, *args, **kwargs)
+    try:
+        parser.feed(markup)
+        parser.close()
+    except AssertionError as e:
+        raise ParserRejectedMarkup(e)
+    sink.endData()
+    return "\n".join(sink.pieces)
+
+
+def _selectolax_text(markup):
+    from selectolax.lexbor import LexborHTMLParser
+
+    body = LexborHTMLParser(markup).body
+    if body is None:
+        return ""
+
+    pieces = []
+    for node in body.traverse(include_text=True):
+        if node.tag != "-text":
+            continue
+        if node.parent is not None and node.parent.tag in SKIP_TEXT_TAGS:
+            continue
+        text = node.text_content.strip()
+        if text:
+            pieces.append(text)
+    return "\n".join(pieces)
+
+
+def page_text(soup, backend=None):
+    # Same result as soup.body.get_text(separator="\n", strip=True).
+    backend = backend or BACKEND
+    if not isinstance(soup, ArchivedPage) or backend == "html.parser":
+        return _soup_text(soup)
+    if backend == "stream" or not soup.text_ok or not BODY_TAG.search(soup.raw_markup):
+        return _stream_text(soup.raw_markup, soup.skip_ids)
+    if backend == "selectolax":
+        return _selectolax_text(soup.raw_markup)
+    if backend == "lxml":
+        return _lxml_text(soup.raw_markup)
+    return _soup_text(soup)
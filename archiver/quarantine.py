@@ -0,0 +1,90 @@
+#!/usr/bin/python3
+
+import hashlib
+import json
+import os
+import time
+import traceback
+
+
+# Dead-letter store for bio pages that failed to fetch or parse. A failing
+# page no longer stops the year: it is set aside under
+# quarantine/<year>_<kind>/ (or ARCHIVER_QUARANTINE_DIR) as a JSON file with
+# the listing entry, the capture URL and the exception, next to the raw
+# bytes that were fetched, and the run moves on. The guest stays out of the
+# journal. "archiver.py reprocess" retries only the quarantined items,
+# from the stored bytes unless --refetch is given, and removes the ones
+# that go through.
+
+QUARANTINE_DIR = os.environ.get("ARCHIVER_QUARANTINE_DIR", os.path.join(os.path.dirname(os.path.abspath(__file__)), "quarantine"))
+
+
+class PageFailure(Exception):
+    # A bio page that could not be fetched or parsed, with whatever was
+    # fetched before it failed.
+
+    def __init__(self, error, resolved=None, content=None):
+        super().__init__("%s: %s" % (type(error).__name__, error))
+        self.error = error
+        self.resolved = resolved
+        self.content = content
+
+
+class Quarantine:
+
+    def __init__(self, year, kind, directory=None):
+        self.path = os.path.join(directory or QUARANTINE_DIR, "%s_%s" % (year, kind))
+
+    def _item_path(self, entry):
+        name = hashlib.sha256(("%s\0%s" % (entry["year"], entry["name"])).encode("utf-8")).hexdigest()[:16]
+        return os.path.join(self.path, name)
+
+    def put(self, entry, bio_link, failure):
+        base = self._item_path(entry)
+        previous = self._read(base + ".json")
+        item = {
+            "entry": entry,
+            "bio_link": bio_link,
+            "resolved": failure.resolved,
+            "error": type(failure.error).__name__,
+            "message": str(failure.error),
+            "traceback": "".join(traceback.format_exception(failure.error)),
+            "has_content": failure.content is not None,
+            "attempts": previous["attempts"] + 1 if previous else 1,
+            "at": int(time.time()),
+        }
+        os.makedirs(self.path, exist_ok=True)
+        if failure.content is not None:
+            with open(base + ".raw", "wb") as f:
+                f.write(failure.content)
+        elif os.path.exists(base + ".raw"):
+            os.remove(base + ".raw")
+        with open(base + ".json.tmp", "w", encoding="utf-8") as f:
+            json.dump(item, f, indent=1, ensure_ascii=False)
+        os.replace(base + ".json.tmp", base + ".json")
+        return item
+
+    def _read(self, path):
+        if not os.path.exists(path):
+            return None
+        with open(path, encoding="utf-8") as f:
+            return json.load(f)
+
+    def items(self):
+        if not os.path.isdir(self.path):
+            return []
+        return [self._read(os.path.join(self.path, name)) for name in sorted(os.listdir(self.path)) if name.endswith(".json")]
+
+    def content(self, item):
+        if not item["has_content"]:
+            return None
+        with open(self._item_path(item["entry"]) + ".raw", "rb") as f:
+            return f.read()
+
+    def remove(self, item):
+        base = self._item_path(item["entry"])
+        for path in (base + ".json", base + ".raw"):
+            if os.path.exists(path):
+                os.remove(path)
+        if os.path.isdir(self.path) and not os.listdir(self.path):
+            os.rmdir(self.path)
@@ -0,0 +1,149 @@
+#!/usr/bin/python3
+
+import random
+import threading
+import time
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+import metrics
+
+
+# Per-host request pacing for the archiver. Each host gets a token bucket
+# whose refill rate adapts to how the host is behaving: it creeps up while
+# responses are quick, backs off when latency climbs, and halves on a 429/503
+# (honouring Retry-After). Repeated failures trip a circuit breaker that holds
+# every worker off the host until a cooldown has passed.
+
+INITIAL_RATE = 1.0
+MIN_RATE = 0.05
+MAX_RATE = 4.0
+BURST = 4
+TARGET_LATENCY = 2.0
+LATENCY_SMOOTHING = 0.2
+
+BACKOFF_BASE = 2.0
+
+FAILURE_THRESHOLD = 5
+COOLDOWN = 60.0
+MAX_COOLDOWN = 900.0
+
+
+def backoff_delay(attempt, cap):
+    # Full jitter: anywhere between 0 and the exponential ceiling.
+    return random.uniform(0, min(cap, BACKOFF_BASE * (2 ** attempt)))
+
+
+def parse_retry_after(value):
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        when = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if when.tzinfo is None:
+        when = when.replace(tzinfo=timezone.utc)
+    return max(0.0, (when - datetime.now(timezone.utc)).total_seconds())
+
+
+class HostLimiter:
+
+    def __init__(self, host):
+        self.host = host
+        self.lock = threading.Lock()
+        self.rate = INITIAL_RATE
+        self.tokens = float(BURST)
+        self.updated = time.monotonic()
+        self.latency = None
+        self.blocked_until = 0.0
+        self.failures = 0
+        self.cooldown = COOLDOWN
+        self.open_until = 0.0
+        self.probing = False
+
+    def _refill(self, now):
+        self.tokens = min(float(BURST), self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def acquire(self):
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                self._refill(now)
+
+                if self.open_until > now:
+                    wait = self.open_until - now
+                elif self.open_until and self.probing:
+                    # Half-open: one probe request is already in flight.
+                    wait = 1.0
+                elif self.blocked_until > now:
+                    wait = self.blocked_until - now
+                elif self.tokens >= 1.0:
+                    self.tokens -= 1.0
+                    if self.open_until:
+                        self.probing = True
+                    return self.probing
+                else:
+                    wait = (1.0 - self.tokens) / self.rate
+            time.sleep(wait)
+
+    def record_success(self, latency):
+        with self.lock:
+            if self.latency is None:
+                self.latency = latency
+            else:
+                self.latency += LATENCY_SMOOTHING * (latency - self.latency)
+
+            if self.latency > TARGET_LATENCY:
+                self.rate = max(MIN_RATE, self.rate * 0.75)
+            else:
+                self.rate = min(MAX_RATE, self.rate + 0.1)
+
+            self.failures = 0
+            self.cooldown = COOLDOWN
+            self.open_until = 0.0
+            self.probing = False
+
+    def end_probe(self):
+        # The probe ended without a success or failure being recorded (an
+        # unexpected error); let the next request probe instead.
+        with self.lock:
+            self.probing = False
+
+    def record_throttle(self, retry_after):
+        with self.lock:
+            self.rate = max(MIN_RATE, self.rate / 2)
+            self.tokens = 0.0
+            if retry_after is not None:
+                self.blocked_until = max(self.blocked_until, time.monotonic() + retry_after)
+            metrics.warning("%s throttled us, rate now %.2f req/s" % (self.host, self.rate))
+            self._record_failure()
+
+    def record_failure(self):
+        with self.lock:
+            self._record_failure()
+
+    def _record_failure(self):
+        self.failures += 1
+        if self.probing or self.failures >= FAILURE_THRESHOLD:
+            if self.probing:
+                self.cooldown = min(MAX_COOLDOWN, self.cooldown * 2)
+            self.open_until = time.monotonic() + self.cooldown
+            self.probing = False
+            metrics.warning("circuit open for %s, cooling down %.0f seconds" % (self.host, self.cooldown))
+
+
+_limiters = {}
+_limiters_lock = threading.Lock()
+
+
+def limiter_for(host):
+    with _limiters_lock:
+        limiter = _limiters.get(host)
+        if limiter is None:
+            limiter = HostLimiter(host)
+            _limiters[host] = limiter
+    return limiter
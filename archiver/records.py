@@ -0,0 +1,65 @@
+#!/usr/bin/python3
+
+import json
+import os
+from parsers import installed
+
+
+# Reading and writing extracted guest records. One record per guest row,
+# text in the clear: year, guest_name, url, biography, blurb,
+# guest_category and guest_type. The format follows the file extension:
+# .ndjson (one JSON object per line) always works, .parquet needs pyarrow.
+
+COLUMNS = ("year", "guest_name", "url", "biography", "blurb", "guest_category", "guest_type")
+FORMATS = ("ndjson", "parquet")
+
+
+HAVE_PARQUET = installed("pyarrow.parquet")
+
+
+def file_format(path):
+    extension = os.path.splitext(path)[1].lstrip(".").lower()
+    if extension == "parquet":
+        if not HAVE_PARQUET:
+            raise RuntimeError("%s: writing or reading parquet needs pyarrow installed" % path)
+        return "parquet"
+    return "ndjson"
+
+
+def record_of(row):
+    record = {column: row.get(column) for column in COLUMNS}
+    # Tagged backfill years come out of the listing as strings.
+    record["year"] = int(record["year"])
+    return record
+
+
+def write_records(path, rows):
+    # Writes the whole file at once, through a temporary file, so a failed
+    # run never leaves a half-written staging file behind.
+    directory = os.path.dirname(os.path.abspath(path))
+    os.makedirs(directory, exist_ok=True)
+    records = [record_of(row) for row in rows]
+    partial = path + ".tmp"
+    if file_format(path) == "parquet":
+        import pyarrow
+        import pyarrow.parquet
+        pyarrow.parquet.write_table(pyarrow.Table.from_pylist(records), partial)
+    else:
+        with open(partial, "w", encoding="utf-8") as f:
+            for record in records:
+                f.write(json.dumps(record, ensure_ascii=False) + "\n")
+    os.replace(partial, path)
+    return len(records)
+
+
+def read_records(path):
+    if file_format(path) == "parquet":
+        import pyarrow.parquet
+        for record in pyarrow.parquet.read_table(path).to_pylist():
+            yield record_of(record)
+        return
+
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            if line.strip():
+                yield record_of(json.loads(line))
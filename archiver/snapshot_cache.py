@@ -0,0 +1,109 @@
+#!/usr/bin/python3
+
+import hashlib
+import json
+import os
+import sys
+import tempfile
+import time
+
+
+# Local content-addressed store for archived pages. Page bodies live under
+# objects/ named by the sha256 of their bytes; urls/ maps the sha256 of each
+# Wayback URL to a small JSON entry with the status, headers and body digest.
+# Identical bodies (Wayback serves plenty of them) are only stored once.
+
+CACHE_DIR = os.environ.get("ARCHIVER_CACHE_DIR", os.path.join(os.path.dirname(os.path.abspath(__file__)), "snapshot_cache"))
+ENABLED = os.environ.get("ARCHIVER_CACHE", "1") != "0"
+
+
+def url_key(url):
+    return hashlib.sha256(url.encode("utf-8")).hexdigest()
+
+
+def _entry_path(root, url):
+    key = url_key(url)
+    return os.path.join(root, "urls", key[:2], key + ".json")
+
+
+def _object_path(root, digest):
+    return os.path.join(root, "objects", digest[:2], digest)
+
+
+def _write_atomic(path, data):
+    directory = os.path.dirname(path)
+    os.makedirs(directory, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=".tmp-")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+    except Exception:
+        os.unlink(tmp_path)
+        raise
+
+
+def lookup(url, root=None):
+    # An explicit root (e.g. a record/replay bundle) is used even when the
+    # default cache is disabled.
+    if root is None:
+        if not ENABLED:
+            return None
+        root = CACHE_DIR
+
+    try:
+        with open(_entry_path(root, url), "r", encoding="utf-8") as f:
+            entry = json.load(f)
+    except (FileNotFoundError, ValueError):
+        return None
+
+    entry["content"] = None
+    if entry.get("sha256") is not None:
+        try:
+            with open(_object_path(root, entry["sha256"]), "rb") as f:
+                entry["content"] = f.read()
+        except FileNotFoundError:
+            return None
+
+    return entry
+
+
+def store(url, status, headers, content, root=None):
+    if root is None:
+        if not ENABLED:
+            return None
+        root = CACHE_DIR
+
+    digest = None
+    if content is not None:
+        digest = hashlib.sha256(content).hexdigest()
+        object_path = _object_path(root, digest)
+        if not os.path.exists(object_path):
+            _write_atomic(object_path, content)
+
+    entry = {
+        "url": url,
+        "status": status,
+        "headers": dict(headers or {}),
+        "sha256": digest,
+        "fetched": int(time.time()),
+    }
+    _write_atomic(_entry_path(root, url), json.dumps(entry, indent=1).encode("utf-8"))
+    return digest
+
+
+def seed(url, filename):
+    # Load a hand-saved page (e.g. 2007_backfill.soup) into the cache so the
+    # scripts can pick it up through scrape_archived_page().
+    with open(filename, "rb") as f:
+        content = f.read()
+    return store(url, 200, {"Content-Type": "text/html"}, content)
+
+
+if __name__ == "__main__":
+    if len(sys.argv) != 4 or sys.argv[1] != "seed":
+        print("usage: %s seed <wayback_url> <file>" % sys.argv[0])
+        sys.exit(1)
+
+    digest = seed(sys.argv[2], sys.argv[3])
+    print("cached %s as %s" % (sys.argv[2], digest))
@@ -0,0 +1,337 @@
+#!/usr/bin/python3
+
+import re
+from normalize import COLLAPSE_PATTERN, LITERAL_ESCAPES, TAG_RESIDUE
+
+
+# What each year script scrapes, as data for engine.py. A spec names the
+# listing page (or a saved .soup file), where the guest entries are on it,
+# how names and blurbs are cleaned, and, for years that link to per-guest
+# pages, how the biography is cut out of that page's text. The site was
+# redesigned a handful of times, so most years just pick one of the page
+# families below and add their URLs.
+#
+# Cleanup steps run in order on the extracted text:
+#   ("replace", old, new)  ("sub", pattern, repl[, flags])  ("strip",)
+#   ("lstrip",)  ("drop_name", "once" | "prefix" | "leading")  ("empty_none",)
+
+SKIP = "skip"
+
+COLLAPSE = ("sub", COLLAPSE_PATTERN, " ")
+NAME_CLEAN = [("replace", "\n", " "), COLLAPSE]
+
+# Literal backslash sequences some of the later pages carry in their text.
+LITERAL_NBSP = [("replace", escape, " ") for escape in LITERAL_ESCAPES]
+BLOCK_CLEAN = [("replace", tag, " ") for tag in TAG_RESIDUE] + [("replace", "\n", " "), COLLAPSE] + LITERAL_NBSP
+
+# Text lines on the 2013-2018 pages that bracket a biography.
+VENDORS = {"Vendors": None}
+DCI_2013 = ["© 1987 – 2013 DCI, Inc. All Rights Reserved."]
+DCI_FOOTERS = [
+    "© 2013 – 2014 DCI, Inc. All Rights Reserved.",
+    "© 2015 DCI, Inc. All Rights Reserved.",
+    "© 2017 DCI, Inc. All Rights Reserved.",
+    "© 2016 DCI, Inc. All Rights Reserved.",
+    "© 2014 DCI, Inc. All Rights Reserved.",
+    "© 2018 DCI, Inc. All Rights Reserved.",
+    "© 2019 DCI, Inc. All Rights Reserved.",
+    "© 2020 DCI, Inc. All Rights Reserved.",
+]
+
+GUEST_HEADINGS = {"GUESTS": "guest", "GUEST": "guest", "ATTENDING PROFESSIONAL": "attending professional", "PERFORMANCE ACT": "performance act"}
+
+NON_PERFORMER_HEADERS = [
+    "people to see", "things to do", "programming", "travel", "resources",
+    "featured", "guests", "pros", "overview", "event", "info", "schedule",
+    "registration", "tickets", "policies", "faq", "news", "contact",
+    "dragon con", "photo ops", "autographs", "volunteer", "sponsors",
+    "at the show",
+]
+
+
+def slice_bio(first, last, squash=False):
+    return {"slice": (first, last), "clean": "squash" if squash else "newlines"}
+
+
+def marker_bio(start, end=(), end_contains=(), end_before=None, missing_start=None, missing_end=None, drop_replacement_char=True):
+    return {
+        "start": start,
+        "end": list(end),
+        "end_contains": list(end_contains),
+        "end_before": end_before,
+        "missing_start": missing_start,
+        "missing_end": missing_end,
+        "clean": "squash",
+        "drop_replacement_char": drop_replacement_char,
+    }
+
+
+def template_bio(share=0.5):
+    # Cut with the year's learned boilerplate template; see boilerplate.py.
+    return {"template": share, "clean": "squash", "drop_replacement_char": True}
+
+
+# 1997-2003 people/index.html: <li><a>name</a><menu>blurb</menu>
+def li_menu(year, url, people_url, bio):
+    return {
+        "year": year, "kind": "scrape_archive", "url": url, "people_url": people_url, "bio": bio,
+        "listing": {
+            "type": "items", "items": "li", "name": "a", "name_text": "stripped", "href": "strip",
+            "description": {"select": "menu", "text": "stripped", "missing": None},
+        },
+    }
+
+
+# 1997-2007 past guest indexes, saved as YYYY_backfill.soup. The bracketed
+# tag at the start of a blurb says which year the row belongs to; each rule
+# is (pattern, year, flags, extra cleanup) where year is "group" for the
+# year in the tag, None for the backfill's own year, or SKIP.
+def tagged_index(year, url, people_url, bio, tags, subs, index_year=None, href="strip", **extra):
+    skip_names = ["INDEX: ALL BIOGRAPHIES"]
+    if index_year is not None:
+        skip_names.append("INDEX: %s GUESTS" % index_year)
+    spec = {
+        "year": year, "kind": "backfill", "url": url, "people_url": people_url, "bio": bio,
+        "file": "%s_backfill.soup" % year, "skip_names": skip_names,
+        "listing": {"type": "tagged_index", "patch_menus": True, "href": href, "tags": tags, "subs": subs},
+    }
+    spec.update(extra)
+    return spec
+
+
+def guest_tags(year, spacing=" ", skip_unknown=False):
+    tags = []
+    if skip_unknown:
+        tags.append((r"^\[XXXX\s+Guest[s]?\]", SKIP, re.IGNORECASE, []))
+    tags += [
+        (r"^\[(\d{4})%sGuest[s]?\]" % spacing, "group", 0, []),
+        (r"^\[(?i:prior-year)\]", str(year - 1), 0, []),
+        (r"^\[(?i:new)\]", str(year), 0, []),
+    ]
+    return tags
+
+
+EMERITUS_SUBS = [("sub", r"\[Guest Emeritus\]\s*", "", re.IGNORECASE), COLLAPSE]
+
+
+# 2004-2012 dc_guests_list: .MainBody > ul > li, category in span.performance.
+def main_body(year, url, people_url, bio, category=True, drop=(), **extra):
+    clean = [COLLAPSE] + [("replace", text, "") for text in drop]
+    spec = {
+        "year": year, "kind": "scrape_archive", "url": url, "people_url": people_url, "bio": bio,
+        "listing": {
+            "type": "items", "containers": ".MainBody", "items": "ul li", "name": "a", "name_text": "stripped",
+            "name_clean": NAME_CLEAN, "href": "raw",
+            "category": "span.performance" if category else None,
+            "description": {"text": "parts", "clean": clean},
+        },
+    }
+    spec.update(extra)
+    return spec
+
+
+MAIN_BODY_DROP = ["[2007 Guest] ", "» "]
+
+
+# 2013-2018 ?q=guests: guest_details_page links and blurb paragraphs,
+# paired by position.
+def detail_links(year, url, people_url, bio, **extra):
+    spec = {
+        "year": year, "kind": "scrape_archive", "url": url, "people_url": people_url, "bio": bio, "guest_type": "guest",
+        "listing": {
+            "type": "detail_links", "links": 'a[href*="guest_details_page"]', "bios": "p", "min_words": 5,
+            "exclusions": ["for a list of guests", "please click here", "confirmation date"],
+            "description": {"clean": [("drop_name", "leading"), ("strip",), ("replace", "\n", " "), COLLAPSE] + LITERAL_NBSP},
+        },
+    }
+    spec.update(extra)
+    return spec
+
+
+# 2013-2018 attending professionals: <p><b>name</b> blurb</p>, no detail pages.
+def bold_paragraphs(year, url, people_url):
+    return {
+        "year": year, "kind": "scrape_archive_attending", "url": url, "people_url": people_url,
+        "guest_type": "attending professional",
+        "listing": {
+            "type": "items", "containers": 'div[class="content clearfix"]', "items": "p", "name": "b",
+            "name_clean": NAME_CLEAN,
+            "description": {"clean": [("drop_name", "prefix"), ("lstrip",), ("empty_none",)]},
+        },
+    }
+
+
+# 2013-2018 performers: one div per letter (id="A", ...) of <p><a>name</a> blurb</p>.
+def letter_sections(year, url, people_url, bio, **extra):
+    spec = {
+        "year": year, "kind": "scrape_archive_performers", "url": url, "people_url": people_url, "bio": bio,
+        "guest_type": "performance act",
+        "listing": {
+            "type": "items", "containers": "div[id]", "container_id": "upper", "items": ":scope > p", "name": "a",
+            "name_text": "stripped", "name_clean": NAME_CLEAN, "href": "raw",
+            "description": {"text": "strip", "clean": [
+                ("strip",), ("drop_name", "prefix"), ("replace", "»", ""), ("replace", "\n", " "), COLLAPSE,
+                ("replace", "\xa0", " "), ("empty_none",),
+            ]},
+        },
+    }
+    spec.update(extra)
+    return spec
+
+
+# 2019-2024 guests and performers: .guest-blocks li with an h4 name. These
+# years put the blurb in the biography column.
+def guest_blocks(year, kind, url, people_url, guest_type, text):
+    return {
+        "year": year, "kind": kind, "url": url, "people_url": people_url, "guest_type": guest_type,
+        "blurb_column": "biography",
+        "listing": {
+            "type": "items", "container": ".guest-blocks", "items": "li", "name": "h4", "name_clean": NAME_CLEAN,
+            "description": {"select": "p", "text": text, "missing": "", "clean": BLOCK_CLEAN + [("empty_none",)]},
+        },
+    }
+
+
+# 2019-2024 professionals: div.pro-blocks article li with an h4 and a p.
+def pro_blocks(year, url, people_url, collapse=False):
+    clean = [("replace", "\n", " "), COLLAPSE, ("replace", "\xa0", " ")] if collapse else []
+    return {
+        "year": year, "kind": "scrape_archive_attending", "url": url, "people_url": people_url,
+        "guest_type": "attending professional",
+        "listing": {
+            "type": "items", "container": "div.pro-blocks", "items": "article li", "name": "h4",
+            "description": {"select": "p", "text": "spaced", "required": True, "clean": clean + [("empty_none",)]},
+        },
+    }
+
+
+# 2020 performers: h3 name followed by a p blurb, mixed in with page headings.
+def headings(year, url, people_url):
+    return {
+        "year": year, "kind": "scrape_archive_performers", "url": url, "people_url": people_url,
+        "guest_type": "performance act", "blurb_column": "biography",
+        "listing": {
+            "type": "headings", "headings": "h3", "min_length": 40, "skip_headers": NON_PERFORMER_HEADERS,
+            "description": {"clean": BLOCK_CLEAN},
+        },
+    }
+
+
+# 2019-2024 people-to-see: li with an h3.today name; fills in the blurb on
+# rows the other kinds inserted.
+def today_blurbs(year, url, **extra):
+    spec = {
+        "year": year, "kind": "scrape_archive_backfill_blurb", "url": url, "mode": "update_blurb",
+        "listing": {
+            "type": "items", "items": "li", "name": "h3.today",
+            "description": {"clean": [("drop_name", "once"), ("strip",), ("empty_none",)]},
+        },
+    }
+    spec.update(extra)
+    return spec
+
+
+WB = "https://web.archive.org/web/"
+
+LEGACY_BIO = slice_bio(1, 11)
+SQUASHED_BIO = slice_bio(5, 2, squash=True)
+BIO_2007 = marker_bio({"GUESTS": None}, end_contains=["»"], drop_replacement_char=False)
+BIO_2008 = marker_bio({"GUESTS": None}, end_contains=["»", "Back to Top"], end_before="Back to Top", drop_replacement_char=False)
+BIO_2010 = marker_bio({"GUESTS": None}, end_contains=["»", "Back to Top"], end_before="Back to Top")
+BIO_2011 = marker_bio(GUEST_HEADINGS, end_contains=["»", "Back to Top"], end_before="Back to Top")
+BIO_2012 = marker_bio(dict(GUEST_HEADINGS, **{"PAST GUEST": "guest", "PAST PERFORMANCE ACT": "performance act"}), end_contains=["»", "Back to Top"], end_before="Back to Top")
+BIO_2013 = marker_bio(VENDORS, end=DCI_2013)
+BIO_2013_PERFORMERS = marker_bio(VENDORS, end=DCI_2013, missing_start="top")
+BIO_DCI = marker_bio(VENDORS, end=DCI_FOOTERS, missing_end="none")
+BIO_DCI_PERFORMERS = marker_bio(VENDORS, end=DCI_FOOTERS, missing_start="top", missing_end="none")
+
+SPECS = [
+    li_menu(1997, WB + "19970206122852/http://dragoncon.org/people/index.html", WB + "19970206122852/http://www.dragoncon.org/people/", LEGACY_BIO),
+    li_menu(1998, WB + "19980205152402/http://www.dragoncon.org/people/index.html", WB + "19980205152402/http://dragoncon.org/people/", LEGACY_BIO),
+    li_menu(1999, WB + "19990428084340/http://www.dragoncon.org/people/index.html", WB + "19990428084340/http://www.dragoncon.org/people/", LEGACY_BIO),
+    li_menu(2000, WB + "20000815234243if_/http://www.dragoncon.org/people/index.html", WB + "20000818024229if_/http://www.dragoncon.org/people/", LEGACY_BIO),
+    li_menu(2001, WB + "20010603182824/http://www.dragoncon.org/people/index.html", WB + "20010608220101/http://www.dragoncon.org/people/", LEGACY_BIO),
+    li_menu(2002, WB + "20021019021333if_/http://www.dragoncon.org/people/index.html", WB + "20021019021333if_/http://www.dragoncon.org/people/", LEGACY_BIO),
+    li_menu(2003, WB + "20030801073347if_/http://www.dragoncon.org/people/index.html", WB + "20030620174135if_/http://www.dragoncon.org/people/", slice_bio(1, 9)),
+
+    tagged_index(1997, WB + "19970206123949/http://dragoncon.org:80/people/indexall.html", WB + "19970206131518/http://www.dragoncon.org/people/", LEGACY_BIO,
+                 [(r"^\[(\d{4})\]", "group", 0, [])],
+                 [COLLAPSE, ("sub", r"^\[new\]\s*", "")]),
+    tagged_index(1998, WB + "19980224204112/http://www.dragoncon.org/people/indexall.html", WB + "19980224204112/http://www.dragoncon.org/people/", LEGACY_BIO,
+                 [(r"^\[(\d{4}) Guest\]", "group", 0, [("sub", r"^\[new\]\s*", "", re.IGNORECASE), ("sub", r"^\[NEW\]\s*", "")])],
+                 [("sub", r"^\[new\]\s*", ""), COLLAPSE], index_year=1998),
+    tagged_index(2000, WB + "20000817063902if_/http://www.dragoncon.org/people/indexall.html", WB + "20000817063902if_/http://www.dragoncon.org/people/", LEGACY_BIO,
+                 guest_tags(2000), EMERITUS_SUBS, index_year=2000),
+    tagged_index(2001, WB + "20010818143354/http://www.dragoncon.org/people/indexall.html", WB + "20010818143354/http://www.dragoncon.org/people/", LEGACY_BIO,
+                 guest_tags(2001), EMERITUS_SUBS, index_year=2001),
+    tagged_index(2002, WB + "20021003020309if_/http://www.dragoncon.org/people/indexall.html", WB + "20021003020309if_/http://www.dragoncon.org/people/", LEGACY_BIO,
+                 guest_tags(2002), EMERITUS_SUBS, index_year=2002),
+    tagged_index(2003, WB + "20030803041334if_/http://www.dragoncon.org/people/indexall.html", WB + "20030803041334if_/http://www.dragoncon.org/people/", LEGACY_BIO,
+                 guest_tags(2003), EMERITUS_SUBS, index_year=2003),
+    tagged_index(2004, WB + "20040810143003/http://www.dragoncon.org/people/01_past_guests.htm", WB + "20040810143003/http://www.dragoncon.org/people/", SQUASHED_BIO,
+                 guest_tags(2004, r"\s+", skip_unknown=True), EMERITUS_SUBS, index_year=2004),
+    tagged_index(2005, WB + "20050624081426/http://www.dragoncon.org/people/01_past_guests.htm", WB + "20050624081426/http://www.dragoncon.org/people/", SQUASHED_BIO,
+                 guest_tags(2005, r"\s+", skip_unknown=True), EMERITUS_SUBS, index_year=2004),
+    tagged_index(2006, WB + "20060814171745/http://www.dragoncon.org/dc_past_guests.php", WB + "20060814171745/http://www.dragoncon.org/", SQUASHED_BIO,
+                 [(r"^\[XXXX\s+Guest[s]?\]", None, re.IGNORECASE, [])] + guest_tags(2006, r"\s+"), EMERITUS_SUBS, index_year=2004, href="nospace"),
+    tagged_index(2007, WB + "20070821054810/http://dragoncon.org/dc_past_guests.php", WB + "20070821054810/http://www.dragoncon.org/", BIO_2007,
+                 [(r"\[XXXX\s+Guest[s]?\]", SKIP, re.IGNORECASE, []), (r"^\[0\s+Guest[s]?\]", SKIP, re.IGNORECASE, [])] + guest_tags(2007, r"\s+"),
+                 EMERITUS_SUBS, index_year=2007, href="nospace",
+                 name_fixes={"Claudia  Christian": "Claudia Christian", "Brett  Dawson": "Brett Dawson", "William  Stout": "William Stout"}),
+
+    main_body(2004, WB + "20040902024549/http://www.dragoncon.org/dc_guests_list.htm", WB + "20040902024549/http://www.dragoncon.org/", SQUASHED_BIO, category=False),
+    main_body(2005, WB + "20050628004726/http://www.dragoncon.org/dc_guests_list.htm", WB + "20050628004726/http://www.dragoncon.org/", SQUASHED_BIO, category=False, file="2005.soup"),
+    main_body(2006, WB + "20060901104223/http://dragoncon.org/dc_guests_list.php", WB + "20060901104223/http://dragoncon.org/", SQUASHED_BIO),
+    main_body(2007, WB + "20070822161123/http://www.dragoncon.org/dc_guests_list.php", WB + "20070822161123/http://dragoncon.org/", BIO_2007, drop=MAIN_BODY_DROP),
+    main_body(2008, WB + "20080901115701/http://www.dragoncon.org/dc_guests_list.php", WB + "20080901115701/http://www.dragoncon.org/", BIO_2008, drop=MAIN_BODY_DROP),
+    main_body(2009, WB + "20090830170943/http://www.dragoncon.org/dc_guests_list.php", WB + "20090830170943/http://www.dragoncon.org/", BIO_2008, drop=MAIN_BODY_DROP),
+    main_body(2010, WB + "20100826064922/http://www.dragoncon.org/dc_guests_list.php", WB + "20100826064922/http://www.dragoncon.org/", BIO_2010, drop=MAIN_BODY_DROP + ["�"]),
+    main_body(2011, WB + "20110902072446/http://www.dragoncon.org/dc_guests_list.php", WB + "20110902072446/http://www.dragoncon.org/", BIO_2011, drop=MAIN_BODY_DROP + ["�"]),
+    main_body(2012, WB + "20120831014328/http://www.dragoncon.org/dc_guests_list.php", WB + "20120831014328/http://www.dragoncon.org/", BIO_2012, drop=MAIN_BODY_DROP + ["�"]),
+
+    detail_links(2013, WB + "20130812085000/http://www.dragoncon.org/?q=guests", WB + "20130812085000/http://www.dragoncon.org/", BIO_2013),
+    bold_paragraphs(2013, WB + "20130812115012/http://www.dragoncon.org/?q=attending-professionals-view", WB + "20130812115012/http://www.dragoncon.org/"),
+    letter_sections(2013, WB + "20130812164042/http://www.dragoncon.org/?q=performers_list", WB + "20130812164042/http://www.dragoncon.org/", BIO_2013_PERFORMERS),
+    detail_links(2014, WB + "20140920120547/http://www.dragoncon.org/?q=guests", WB + "20140920120547/http://www.dragoncon.org/", BIO_DCI, null_empty_biography=True),
+    bold_paragraphs(2014, WB + "20140922081302/http://dragoncon.org/?q=attending-professionals-view", WB + "20140922081302/http://www.dragoncon.org/"),
+    letter_sections(2014, WB + "20140919203935/http://dragoncon.org/?q=performers_list", WB + "20140919203935/http://www.dragoncon.org/", BIO_DCI_PERFORMERS),
+    detail_links(2015, WB + "20150905105936/http://www.dragoncon.org/?q=guests", WB + "20150905105936/http://www.dragoncon.org/", BIO_DCI, null_empty_biography=True),
+    bold_paragraphs(2015, WB + "20150905105635/http://www.dragoncon.org/?q=attending-professionals-view", WB + "20150905105635/http://www.dragoncon.org/"),
+    letter_sections(2015, WB + "20150905105151/http://www.dragoncon.org/?q=performers_list", WB + "20150905105151/http://www.dragoncon.org/", BIO_DCI_PERFORMERS),
+    detail_links(2016, WB + "20160823092730/http://www.dragoncon.org/?q=guests", WB + "20160823092730/http://www.dragoncon.org/", BIO_DCI, null_empty_biography=True),
+    bold_paragraphs(2016, WB + "20160818062951/http://www.dragoncon.org/?q=attending-professionals-view", WB + "20160818062951/http://www.dragoncon.org/"),
+    letter_sections(2016, WB + "20160814140941/http://www.dragoncon.org/?q=performers_list", WB + "20160814140941/http://www.dragoncon.org/", BIO_DCI_PERFORMERS),
+    detail_links(2017, WB + "20170905005259/http://www.dragoncon.org/?q=guests", WB + "20170905005259/http://www.dragoncon.org/", BIO_DCI, null_empty_biography=True,
+                 name_fixes={"Ricky  Steamboat": "Ricky Steamboat"}),
+    bold_paragraphs(2017, WB + "20170905004946/http://dragoncon.org/?q=attending-professionals-view", WB + "20170905004946/http://www.dragoncon.org/"),
+    letter_sections(2017, WB + "20170905002306/http://www.dragoncon.org/?q=performers_list", WB + "20170905002306/http://www.dragoncon.org/", BIO_DCI_PERFORMERS),
+    detail_links(2018, WB + "20180902123222/http://www.dragoncon.org/?q=guests", WB + "20180902123222/http://www.dragoncon.org/", BIO_DCI, null_empty_biography=True,
+                 name_fixes={"Ricky  Steamboat": "Ricky Steamboat"}),
+    bold_paragraphs(2018, WB + "20180902154932/http://dragoncon.org/?q=attending-professionals-view", WB + "20180902154932/http://www.dragoncon.org/"),
+    letter_sections(2018, WB + "20180902113227/http://dragoncon.org/?q=performers_list", WB + "20180902113227/http://www.dragoncon.org/", BIO_DCI_PERFORMERS),
+
+    guest_blocks(2019, "scrape_archive", WB + "20190823192528/https://www.dragoncon.org/people-to-see/guests/", WB + "20190823192528/http://www.dragoncon.org/", "guest", "text"),
+    pro_blocks(2019, WB + "20190911054419/http://www.dragoncon.org/people-to-see/professionals/", WB + "20190823192528/http://www.dragoncon.org/"),
+    guest_blocks(2019, "scrape_archive_performers", WB + "20190906223514/https://www.dragoncon.org/people-to-see/performers/", WB + "20190823192528/http://www.dragoncon.org/", "performance act", "strip"),
+    today_blurbs(2019, WB + "20190911053543/http://www.dragoncon.org/people-to-see/"),
+    guest_blocks(2020, "scrape_archive", WB + "20200902030948/https://www.dragoncon.org/people-to-see-2/guests/", WB + "20190823192528/http://www.dragoncon.org/", "guest", "text"),
+    pro_blocks(2020, WB + "20200830125317/https://www.dragoncon.org/people-to-see-2/professionals/", WB + "20200830125317/http://www.dragoncon.org/"),
+    headings(2020, WB + "20200830133846/https://www.dragoncon.org/people-to-see-2/performers/", WB + "20200830133846/http://www.dragoncon.org/"),
+    today_blurbs(2020, WB + "20200929061632/https://www.dragoncon.org/people-to-see-2/"),
+    guest_blocks(2021, "scrape_archive", WB + "20210819152356/https://www.dragoncon.org/people-to-see-2/guests/", WB + "20210819152356/http://www.dragoncon.org/", "guest", "text"),
+    pro_blocks(2021, WB + "20210819152319/https://www.dragoncon.org/people-to-see-2/professionals/", WB + "20210819152319/http://www.dragoncon.org/"),
+    guest_blocks(2021, "scrape_archive_performers", WB + "20210819152320/https://www.dragoncon.org/people-to-see-2/performers/", WB + "20210819152320/http://www.dragoncon.org/", "performance act", "strip"),
+    today_blurbs(2021, WB + "20210819152349/https://www.dragoncon.org/people-to-see-2/"),
+    guest_blocks(2022, "scrape_archive", WB + "20220812114341/https://www.dragoncon.org/people-to-see-2/guests/", WB + "20220812114341/http://www.dragoncon.org/", "guest", "text"),
+    pro_blocks(2022, WB + "20220521085918/https://www.dragoncon.org/people-to-see-2/professionals/", WB + "20220811141941/http://www.dragoncon.org/", collapse=True),
+    guest_blocks(2022, "scrape_archive_performers", WB + "20220812111251/https://www.dragoncon.org/people-to-see-2/performers/", WB + "20220812111251/http://www.dragoncon.org/", "performance act", "strip"),
+    today_blurbs(2022, WB + "20220812114341/https://www.dragoncon.org/people-to-see-2/"),
+    guest_blocks(2023, "scrape_archive", WB + "20230914224402/https://www.dragoncon.org/people-to-see-2/guests/", WB + "20230914224402/http://www.dragoncon.org/", "guest", "text"),
+    pro_blocks(2023, WB + "20230924201512/https://www.dragoncon.org/people-to-see-2/professionals/", WB + "20230924201512/http://www.dragoncon.org/", collapse=True),
+    guest_blocks(2023, "scrape_archive_performers", WB + "20230928233028/https://www.dragoncon.org/people-to-see-2/performers/", WB + "20230928233028/http://www.dragoncon.org/", "performance act", "strip"),
+    today_blurbs(2023, WB + "20230914224402/https://www.dragoncon.org/people-to-see-2/"),
+    guest_blocks(2024, "scrape_archive", WB + "20240812132457/https://www.dragoncon.org/people-to-see-2/guests/", WB + "20240812132457/http://www.dragoncon.org/", "guest", "text"),
+    pro_blocks(2024, WB + "20240811034131/https://www.dragoncon.org/people-to-see-2/professionals/", WB + "20240811034131/http://www.dragoncon.org/", collapse=True),
+    guest_blocks(2024, "scrape_archive_performers", WB + "20230928233028/https://www.dragoncon.org/people-to-see-2/performers/", WB + "20230928233028/http://www.dragoncon.org/", "performance act", "strip"),
+    today_blurbs(2024, WB + "20240812132457/https://www.dragoncon.org/people-to-see-2/", skip_names=["HEALTH"]),
+]
@@ -0,0 +1,207 @@
+#!/usr/bin/python3
+
+import argparse
+import os
+import re
+import sys
+import tempfile
+import pymysql
+import engine
+import guestdb
+import metrics
+from records import COLUMNS, read_records, write_records
+from wayback import init_fetch_mode
+
+
+# Bulk path for rebuilding whole years. export writes what the selected
+# specs would insert to one staging file, and --dry-run on the year
+# scripts, engine.py or archiver.py writes one file per spec (see
+# records.py for the format); the text is in the clear so files can be
+# reviewed, or compared with diff. merge bulk-loads staging files into a
+# temporary table with LOAD DATA LOCAL INFILE and merges it into guests and
+# yearly_guests with three set-based statements, in one transaction. Rows
+# already in yearly_guests (uniq_guest_year) are left as they are, as with
+# a normal run. Blurb backfills still run through engine.py after the merge.
+#
+#   python3 staging.py export --years 2013-2018 staging/2013-2018.ndjson
+#   python3 archiver.py run --years 2013-2018 --kinds guests,attending --jobs 4 --dry-run staging/
+#   python3 staging.py diff staging-old/ staging/
+#   python3 staging.py merge staging/
+
+ENCODED = ("biography", "blurb")
+STAGED_COLUMNS = COLUMNS + ("guest_key",)
+
+CREATE_STAGING = """CREATE TEMPORARY TABLE yearly_guests_staging (
+  `line` int NOT NULL AUTO_INCREMENT PRIMARY KEY,
+  `year` int NOT NULL,
+  `guest_id` int DEFAULT NULL,
+  `guest_name` varchar(512) NOT NULL,
+  `guest_key` varchar(512) CHARACTER SET utf8mb4 COLLATE utf8mb4_bin NOT NULL,
+  `url` varchar(512) DEFAULT NULL,
+  `biography` mediumtext,
+  `blurb` text,
+  `guest_category` varchar(33) DEFAULT NULL,
+  `guest_type` varchar(100) DEFAULT NULL
+) DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_0900_ai_ci"""
+
+LOAD_STAGING = ("LOAD DATA LOCAL INFILE %s INTO TABLE yearly_guests_staging CHARACTER SET utf8mb4 (" + ", ".join(STAGED_COLUMNS) + ")")
+INSERT_STAGING = "INSERT INTO yearly_guests_staging (" + ", ".join(STAGED_COLUMNS) + ") VALUES (" + ", ".join(["%s"] * len(STAGED_COLUMNS)) + ")"
+
+# New names get a guests row keyed on uniq_guest_key, like allocateGuestIds().
+NEW_GUESTS = """INSERT INTO guests (guest_name, guest_key)
+SELECT MIN(s.guest_name), s.guest_key FROM yearly_guests_staging s
+GROUP BY s.guest_key
+ON DUPLICATE KEY UPDATE guest_id = guests.guest_id"""
+
+RESOLVE_GUESTS = """UPDATE yearly_guests_staging s
+JOIN guests g ON g.guest_key = s.guest_key
+SET s.guest_id = g.guest_id"""
+
+# In file order, so the first of two rows for a guest and year wins.
+MERGE_YEARLY_GUESTS = """INSERT INTO yearly_guests (year, guest_id, guest_name, url, biography, blurb, guest_category, guest_type)
+SELECT s.year, s.guest_id, s.guest_name, s.url, s.biography, s.blurb, s.guest_category, s.guest_type
+FROM yearly_guests_staging s ORDER BY s.line
+ON DUPLICATE KEY UPDATE guest_id = yearly_guests.guest_id"""
+
+TSV_ESCAPES = str.maketrans({"\\": "\\\\", "\t": "\\t", "\n": "\\n", "\r": "\\r", "\0": "\\0"})
+
+
+def export(specs, path):
+    rows = []
+    for spec in specs:
+        if spec.get("mode") == "update_blurb":
+            metrics.info("%s %s: blurb backfill, run it with engine.py after loading" % (spec["year"], spec["kind"]))
+            continue
+        spec_rows, pages = engine.extract_records(spec, prefetch=True, parallel=True)
+        rows.extend(spec_rows)
+        metrics.info("%s %s: %s rows from %s pages" % (spec["year"], spec["kind"], len(spec_rows), pages))
+    metrics.info("wrote %s rows to %s" % (write_records(path, rows), path))
+
+
+def staging_files(paths):
+    # Directories expand to their staging files in the order a run would
+    # write them: by year, then kind.
+    def order(filename):
+        match = re.match(r"^(\d{4})_(.+)\.(?:ndjson|parquet)$", filename)
+        if match is None:
+            return (1, 0, 0, filename)
+        kind = match.group(2)
+        rank = engine.KIND_ORDER.index(kind) if kind in engine.KIND_ORDER else len(engine.KIND_ORDER)
+        return (0, int(match.group(1)), rank, filename)
+
+    files = []
+    for path in paths:
+        if os.path.isdir(path):
+            names = [name for name in os.listdir(path) if name.endswith((".ndjson", ".parquet"))]
+            files.extend(os.path.join(path, name) for name in sorted(names, key=order))
+        else:
+            files.append(path)
+    return files
+
+
+def read_staging(paths):
+    for path in staging_files(paths):
+        for row in read_records(path):
+            for column in ENCODED:
+                row[column] = engine.encode(row[column])
+            row["guest_key"] = guestdb.name_key(row["guest_name"])
+            yield tuple(row[column] for column in STAGED_COLUMNS)
+
+
+def tsv_field(value):
+    if value is None:
+        return "\\N"
+    return str(value).translate(TSV_ESCAPES)
+
+
+def fill_staging(cur, rows):
+    with tempfile.NamedTemporaryFile("w", encoding="utf-8", suffix=".tsv", delete=False) as f:
+        for row in rows:
+            f.write("\t".join(tsv_field(value) for value in row) + "\n")
+        tsv_path = f.name
+    try:
+        cur.execute(LOAD_STAGING, (tsv_path,))
+    except (pymysql.err.OperationalError, pymysql.err.InternalError) as e:
+        # Servers started without local_infile refuse the file.
+        metrics.warning("LOAD DATA LOCAL refused (%s), inserting the staging rows instead" % e)
+        cur.executemany(INSERT_STAGING, rows)
+    finally:
+        os.remove(tsv_path)
+
+
+def merge(paths):
+    rows = list(read_staging(paths))
+    con = pymysql.connect(host=guestdb.DB_HOST, user=guestdb.DB_USER, password=guestdb.DB_PASSWORD, database=guestdb.DB_NAME, charset="utf8mb4", local_infile=True)
+    cur = con.cursor()
+    try:
+        cur.execute(CREATE_STAGING)
+        fill_staging(cur, rows)
+        guestdb.claimGuestKeys(cur)
+        new_guests = cur.execute(NEW_GUESTS)
+        cur.execute(RESOLVE_GUESTS)
+        inserted = cur.execute(MERGE_YEARLY_GUESTS)
+        con.commit()
+    except Exception:
+        con.rollback()
+        raise
+    finally:
+        cur.close()
+        con.close()
+    metrics.info("staged %s rows: %s new guests, %s yearly_guests rows inserted" % (len(rows), new_guests, inserted))
+
+
+def keyed_records(paths):
+    # (year, guest_name) -> record; the first one wins, as in merge.
+    records = {}
+    for path in staging_files(paths):
+        for record in read_records(path):
+            records.setdefault((record["year"], record["guest_name"]), record)
+    return records
+
+
+def diff(old_paths, new_paths):
+    old, new = keyed_records(old_paths), keyed_records(new_paths)
+    changes = 0
+    for key in sorted(set(old) | set(new), key=lambda key: (key[0], key[1])):
+        if key not in new:
+            metrics.info("- %s %s" % key)
+        elif key not in old:
+            metrics.info("+ %s %s" % key)
+        elif old[key] != new[key]:
+            fields = [column for column in COLUMNS if old[key][column] != new[key][column]]
+            metrics.info("~ %s %s: %s" % (key + (", ".join(fields),)))
+        else:
+            continue
+        changes += 1
+    metrics.info("%s records differ (%s old, %s new)" % (changes, len(old), len(new)))
+    return changes
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Export years to a staging file, or bulk-load one into MySQL.")
+    commands = parser.add_subparsers(dest="command", required=True)
+    export_parser = commands.add_parser("export", help="write the rows the selected specs would insert")
+    export_parser.add_argument("--years", type=engine.parse_years, help="e.g. 2013-2018")
+    export_parser.add_argument("--kinds", type=lambda value: set(value.split(",")), help="e.g. scrape_archive,scrape_archive_attending")
+    export_parser.add_argument("--record", metavar="BUNDLE", help="as for the year scripts")
+    export_parser.add_argument("--replay", metavar="BUNDLE", help="as for the year scripts")
+    export_parser.add_argument("path")
+    merge_parser = commands.add_parser("merge", aliases=["load"], help="merge staging files or directories into guests and yearly_guests")
+    merge_parser.add_argument("paths", nargs="+")
+    diff_parser = commands.add_parser("diff", help="compare two runs' staging files or directories")
+    diff_parser.add_argument("old")
+    diff_parser.add_argument("new")
+    args, _ = parser.parse_known_args(argv)
+
+    if args.command == "export":
+        init_fetch_mode(argv)
+        export(engine.select_specs(args.years, args.kinds), args.path)
+    elif args.command == "diff":
+        return 1 if diff([args.old], [args.new]) else 0
+    else:
+        merge(args.paths)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
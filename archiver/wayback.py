@@ -0,0 +1,363 @@
+#!/usr/bin/python3
+
+import argparse
+import os
+import re
+import sys
+import requests
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urljoin, urlparse
+from requests.adapters import HTTPAdapter
+from bs4 import Comment
+import snapshot_cache
+import cdx
+import metrics
+import ratelimit
+from parsers import decode_markup, make_page
+
+
+# Shared fetch engine for the yearly archiver scripts. Bio pages for a year
+# are handed to prefetch_pages() up front and downloaded by a bounded worker
+# pool; scrape_archived_page() then picks up the finished download instead of
+# going back to the network. Every response, misses included, is kept in
+# the local snapshot cache so reruns don't touch the network at all. When
+# USE_CDX is on, prefetched URLs are first resolved against the CDX index so
+# captures that only exist as 404/403 are skipped without a request.
+# Requests go out through one pooled Session and are paced per host by the
+# adaptive limiter in ratelimit.py.
+#
+# Snapshots are requested in raw mode (the id_ modifier) so Wayback returns
+# the page as originally captured, without its toolbar or rewritten links.
+# normalize_snapshot() then makes both raw and rewritten pages look the same
+# to the parsers: toolbar markup is dropped and links to the archived site
+# become relative to the page, which is what people_url + href expects.
+#
+# init_fetch_mode() picks up --record/--replay from the command line. Record
+# copies every response the run sees (404/403 included) into a fixture bundle;
+# replay serves only from such a bundle and never opens a connection.
+#
+# fetch_later() and page_from_content() split scrape_archived_page() in two
+# for the engine's parse stage: the bytes are fetched here and the page is
+# built from them in a worker process.
+
+MAX_WORKERS = 8
+HOST_CONCURRENCY = 4
+REQUEST_TIMEOUT = 10
+USE_CDX = os.environ.get("ARCHIVER_CDX", "1") != "0"
+RAW_MODE = os.environ.get("ARCHIVER_RAW", "1") != "0"
+
+# Status codes that mean the snapshot simply isn't there. These are treated as
+# "no page" rather than retried.
+SKIP_STATUS_CODES = (400, 403, 404, 520)
+
+# Status codes that mean "slow down". The host limiter halves its rate and
+# waits out any Retry-After before the next attempt.
+THROTTLE_STATUS_CODES = (429, 503)
+
+WAYBACK_HREF = re.compile(r"^(?:https?://web\.archive\.org)?/web/\d{1,14}[a-z]{0,2}_?/(.+)$")
+TOOLBAR_IDS = ("wm-ipp-base", "wm-ipp", "wm-ipp-print", "donato")
+TOOLBAR_INSERT = re.compile(r"<!--\s*BEGIN WAYBACK TOOLBAR INSERT\s*-->.*?<!--\s*END WAYBACK TOOLBAR INSERT\s*-->", re.S)
+TOOLBAR_ID = re.compile(r"""\bid\s*=\s*["']?(?:%s)\b""" % "|".join(re.escape(toolbar_id) for toolbar_id in TOOLBAR_IDS))
+
+RECORD_DIR = None
+REPLAY_DIR = None
+
+_executor = None
+_executor_lock = threading.Lock()
+_pending = {}
+_pending_lock = threading.Lock()
+_plan = {}
+_plan_lock = threading.Lock()
+_host_slots = {}
+_host_slots_lock = threading.Lock()
+
+_session = requests.Session()
+_session.mount("http://", HTTPAdapter(pool_connections=4, pool_maxsize=MAX_WORKERS))
+_session.mount("https://", HTTPAdapter(pool_connections=4, pool_maxsize=MAX_WORKERS))
+
+
+class ReplayMissError(Exception):
+    pass
+
+
+def init_fetch_mode(argv=None):
+    global RECORD_DIR, REPLAY_DIR
+    parser = argparse.ArgumentParser(add_help=False)
+    group = parser.add_mutually_exclusive_group()
+    group.add_argument("--record", metavar="BUNDLE", default=os.environ.get("ARCHIVER_RECORD"))
+    group.add_argument("--replay", metavar="BUNDLE", default=os.environ.get("ARCHIVER_REPLAY"))
+    args, _ = parser.parse_known_args(sys.argv[1:] if argv is None else argv)
+
+    if args.record and args.replay:
+        parser.error("--record and --replay can't be used together")
+
+    RECORD_DIR = args.record
+    REPLAY_DIR = args.replay
+    if RECORD_DIR:
+        metrics.info("recording responses to %s" % RECORD_DIR)
+    if REPLAY_DIR:
+        if not os.path.isdir(REPLAY_DIR):
+            parser.error("replay bundle %s does not exist" % REPLAY_DIR)
+        metrics.info("replaying responses from %s" % REPLAY_DIR)
+    return args
+
+
+def _host_slot(host):
+    with _host_slots_lock:
+        slot = _host_slots.get(host)
+        if slot is None:
+            slot = threading.BoundedSemaphore(HOST_CONCURRENCY)
+            _host_slots[host] = slot
+    return slot
+
+
+def _get_executor():
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(max_workers=MAX_WORKERS, thread_name_prefix="wayback")
+    return _executor
+
+
+def _download(archived_url, retries, delay):
+    # delay is the ceiling for the jittered exponential backoff between attempts.
+    host = urlparse(archived_url).netloc
+    limiter = ratelimit.limiter_for(host)
+    slot = _host_slot(host)
+    for attempt in range(1, retries + 1):
+        wait = None
+        probe = False
+        try:
+            with slot:
+                probe = limiter.acquire()
+                started = time.monotonic()
+                response = _session.get(archived_url, timeout=REQUEST_TIMEOUT)
+                latency = time.monotonic() - started
+
+            if response.status_code in SKIP_STATUS_CODES:
+                limiter.record_success(latency)
+                metrics.count("status_%s" % response.status_code)
+                metrics.warning(f"Failed to fetch {archived_url}. Status code: {response.status_code}")
+                return response.status_code, response.headers, None
+
+            if response.status_code in THROTTLE_STATUS_CODES:
+                wait = ratelimit.parse_retry_after(response.headers.get("Retry-After"))
+                limiter.record_throttle(wait)
+                metrics.count("throttled")
+                raise requests.HTTPError(f"{response.status_code} throttled", response=response)
+
+            if response.status_code >= 500:
+                limiter.record_failure()
+            else:
+                limiter.record_success(latency)
+
+            response.raise_for_status()
+            return response.status_code, response.headers, response.content
+        except requests.HTTPError as e:
+            status = e.response.status_code if e.response is not None else None
+            if status is not None and status < 500 and status not in THROTTLE_STATUS_CODES:
+                # Other 4xx answers won't change on retry.
+                raise
+            error = e
+        except requests.RequestException as e:
+            limiter.record_failure()
+            error = e
+        finally:
+            if probe:
+                # Whatever happened, a half-open host must not stay blocked.
+                limiter.end_probe()
+
+        metrics.warning(f"Attempt {attempt} for {archived_url} failed: {error}")
+        if attempt >= retries:
+            metrics.warning("Max retries reached. Giving up.")
+            raise error
+
+        if wait is None:
+            wait = ratelimit.backoff_delay(attempt, delay)
+        metrics.count("retries")
+        metrics.info(f"Retrying in {wait:.1f} seconds...")
+        time.sleep(wait)
+
+
+def fetch_archived_page(archived_url, retries=5, delay=300, use_cache=True):
+    # use_cache=False downloads the page again and caches the new bytes.
+    metrics.count("pages")
+    with metrics.stage("fetch"):
+        if REPLAY_DIR:
+            replayed = snapshot_cache.lookup(archived_url, root=REPLAY_DIR)
+            if replayed is None:
+                raise ReplayMissError(f"{archived_url} is not in replay bundle {REPLAY_DIR}")
+            metrics.count("replayed")
+            return replayed["content"]
+
+        cached = snapshot_cache.lookup(archived_url) if use_cache else None
+        if cached is not None:
+            metrics.count("cache_hits")
+            status, headers, content = cached["status"], cached["headers"], cached["content"]
+        else:
+            metrics.count("downloads")
+            status, headers, content = _download(archived_url, retries, delay)
+            snapshot_cache.store(archived_url, status, headers, content)
+
+        if RECORD_DIR:
+            snapshot_cache.store(archived_url, status, headers, content, root=RECORD_DIR)
+        return content
+
+
+def plan_snapshots(urls):
+    if not USE_CDX:
+        return
+    with _plan_lock:
+        unplanned = [url for url in urls if url and url not in _plan]
+        _plan.update(cdx.build_fetch_plan(unplanned, fetch_archived_page))
+
+
+def raw_url(archived_url):
+    parts = cdx.parse_wayback_url(archived_url)
+    if parts is None or parts[1]:
+        return archived_url
+    return "https://web.archive.org/web/%sid_/%s" % (parts[0], parts[2])
+
+
+def _resolve(archived_url):
+    with _plan_lock:
+        resolved = _plan.get(archived_url, archived_url)
+    if resolved is not None and RAW_MODE:
+        resolved = raw_url(resolved)
+    return resolved
+
+
+def _bare_host(netloc):
+    netloc = netloc.lower()
+    return netloc[4:] if netloc.startswith("www.") else netloc
+
+
+def _relative_href(href, page_url):
+    match = WAYBACK_HREF.match(href)
+    if match is not None:
+        href = match.group(1)
+    elif "://" not in href and not href.startswith("/"):
+        # Already relative to the page.
+        return href
+
+    target = urlparse(urljoin(page_url, href))
+    page = urlparse(page_url)
+    if target.scheme not in ("http", "https") or _bare_host(target.netloc) != _bare_host(page.netloc):
+        return target.geturl()
+
+    directory = page.path[:page.path.rfind("/") + 1] or "/"
+    path = target.path or "/"
+    if not path.startswith(directory):
+        return target.geturl()
+
+    relative = path[len(directory):]
+    if target.query:
+        relative += "?" + target.query
+    if target.fragment:
+        relative += "#" + target.fragment
+    return relative
+
+
+def _strip_toolbar(soup):
+    for comment in soup.find_all(string=lambda text: isinstance(text, Comment) and "BEGIN WAYBACK TOOLBAR INSERT" in text):
+        node = comment.next_sibling
+        while node is not None:
+            following = node.next_sibling
+            if isinstance(node, Comment) and "END WAYBACK TOOLBAR INSERT" in node:
+                node.extract()
+                break
+            node.extract()
+            node = following
+        comment.extract()
+
+    for toolbar_id in TOOLBAR_IDS:
+        for tag in soup.find_all(id=toolbar_id):
+            tag.decompose()
+
+
+def normalize_snapshot(soup, archived_url):
+    _strip_toolbar(soup)
+
+    parts = cdx.parse_wayback_url(archived_url)
+    if parts is None:
+        return soup
+
+    page_url = parts[2]
+    for a in soup.find_all("a", href=True):
+        a["href"] = _relative_href(a["href"].strip(), page_url)
+    return soup
+
+
+def prefetch_pages(urls, retries=5, delay=300):
+    urls = list(urls)
+    plan_snapshots(urls)
+    executor = _get_executor()
+    with _pending_lock:
+        for url in urls:
+            if url and url not in _pending:
+                resolved = _resolve(url)
+                if resolved is None:
+                    continue
+                _pending[url] = executor.submit(fetch_archived_page, resolved, retries, delay)
+
+
+def _planned_capture(archived_url):
+    # The capture to fetch for a URL, None (and a warning) when the CDX
+    # index has no usable one.
+    plan_snapshots([archived_url])
+    resolved = _resolve(archived_url)
+    if resolved is None:
+        metrics.count("no_capture")
+        metrics.warning(f"No usable capture of {archived_url} in the CDX index. Skipping.")
+    return resolved
+
+
+def fetch_later(archived_url, retries=5, delay=300):
+    # The download future for a URL and the capture it resolved to, so the
+    # raw bytes can be handed to another stage; (None, None) when the CDX
+    # index has no usable capture.
+    resolved = _planned_capture(archived_url)
+    if resolved is None:
+        return None, None
+
+    with _pending_lock:
+        future = _pending.pop(archived_url, None)
+        if future is None:
+            future = _get_executor().submit(fetch_archived_page, resolved, retries, delay)
+    return resolved, future
+
+
+def page_from_content(content, resolved):
+    if content is None:
+        return None
+
+    # The toolbar insert is cut out of the markup as well as the soup, so
+    # page_text() can work from the markup without building the tree; any
+    # toolbar elements left over are skipped by id.
+    markup = TOOLBAR_INSERT.sub("", decode_markup(content))
+    return make_page(markup, prepare=lambda soup: normalize_snapshot(soup, resolved), text_ok=TOOLBAR_ID.search(markup) is None, skip_ids=TOOLBAR_IDS)
+
+
+def fetch_content(archived_url, retries=5, delay=300, use_cache=True):
+    # The raw bytes of a page and the capture they came from; (None, None)
+    # when the CDX index has no usable capture. use_cache=False skips both
+    # the snapshot cache and any prefetched download.
+    resolved = _planned_capture(archived_url)
+    if resolved is None:
+        return None, None
+
+    with _pending_lock:
+        future = _pending.pop(archived_url, None)
+
+    if future is not None and use_cache:
+        content = future.result()
+    else:
+        content = fetch_archived_page(resolved, retries, delay, use_cache)
+    return content, resolved
+
+
+def scrape_archived_page(archived_url, retries=5, delay=300):
+    content, resolved = fetch_content(archived_url, retries, delay)
+    return page_from_content(content, resolved)
@@ -0,0 +1,9 @@
+-- Unique normalized-name key for guests, used by the archiver to allocate
+-- guest ids without racing other workers. The key is the archiver's
+-- guestdb.name_key() of the name (case folded, accents dropped). It stays
+-- NULL for older duplicate rows; the archiver fills it in for the highest
+-- guest_id of each name the next time it loads its guest index.
+
+ALTER TABLE `guests`
+  ADD COLUMN `guest_key` varchar(512) CHARACTER SET utf8mb4 COLLATE utf8mb4_bin DEFAULT NULL,
+  ADD UNIQUE KEY `uniq_guest_key` (`guest_key`);
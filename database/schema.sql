@@ -147,7 +147,9 @@ DROP TABLE IF EXISTS `guests`;
 CREATE TABLE `guests` (
   `guest_id` int NOT NULL AUTO_INCREMENT,
   `guest_name` varchar(512) NOT NULL,
-  PRIMARY KEY (`guest_id`)
+  `guest_key` varchar(512) CHARACTER SET utf8mb4 COLLATE utf8mb4_bin DEFAULT NULL,
+  PRIMARY KEY (`guest_id`),
+  UNIQUE KEY `uniq_guest_key` (`guest_key`)
 ) ENGINE=InnoDB AUTO_INCREMENT=5817 DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_0900_ai_ci;
 /*!40101 SET character_set_client = @saved_cs_client */;
 